@@ -4,14 +4,79 @@ import os
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Read replicas for GET handlers; reads fall back to the primary when all lag
+    DATABASE_REPLICA_URLS: List[str] = []
+    REPLICA_MAX_LAG_SECONDS: int = 5
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: int = 10
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_DAYS: int = 7
+    # Put the user id in access tokens ("uid") so auth is a primary-key lookup
+    JWT_EMBED_USER_ID: bool = True
+    # Decoded-token -> principal cache used by get_current_user
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # bcrypt work factor and the worker pool that runs it (0 workers = one per core)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_QUEUE: int = 256
     DEEPGRAM_API_KEY: str
     GEMINI_API_KEY: str
     UPLOAD_DIR: str = "uploads"
+    # Processes used for PDF text extraction (0 = one per core)
+    PDF_EXTRACT_WORKERS: int = 0
+    # Background knowledge document ingestion; uploads get 503 when the queue is full
+    KNOWLEDGE_INGEST_WORKERS: int = 2
+    KNOWLEDGE_INGEST_QUEUE_SIZE: int = 100
+    # Pending/processing documents untouched this long (e.g. after a restart) are re-queued or failed
+    KNOWLEDGE_INGEST_STALE_SECONDS: int = 900
+    # Soft-deleted AI profiles are purged in the background in throttled batches
+    PROFILE_REAPER_INTERVAL_SECONDS: int = 30
+    PROFILE_REAPER_BATCH_SIZE: int = 1000
+    PROFILE_REAPER_BATCH_PAUSE_SECONDS: float = 0.2
+    PROFILE_REAPER_LEASE_SECONDS: int = 120
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
     
+    # Write-behind chat log: buffer messages per worker and flush in batches
+    CHAT_WRITE_BEHIND: bool = False
+    CHAT_FLUSH_BATCH_SIZE: int = 200
+    CHAT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    CHAT_JOURNAL_DIR: str = "journal"
+    # Past this many unflushed messages, new messages are inserted directly instead of buffered
+    CHAT_MAX_PENDING: int = 10000
+    
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = 1024
+    # TTS format for clients whose Accept header has no audio preference (opus, mp3, linear16)
+    TTS_DEFAULT_AUDIO_FORMAT: str = "mp3"
+    
+    # Replace Together and Deepgram with in-process fakes (for python -m app.loadgen and offline runs)
+    FAKE_PROVIDERS: bool = False
+    FAKE_LLM_LATENCY_SECONDS: float = 1.0
+    FAKE_SPEECH_LATENCY_SECONDS: float = 0.3
+    
+    # Enables the /admin routes, which require it in X-Admin-Key (empty = admin routes return 404)
+    ADMIN_API_KEY: str = ""
+    # Sampling profiler behind /admin; its thread only runs while a profile is recording
+    PROFILER_SAMPLE_INTERVAL_SECONDS: float = 0.005
+    PROFILER_MAX_WINDOW_SECONDS: int = 60
+    PROFILER_MAX_SESSIONS: int = 4
+    PROFILER_KEEP_PROFILES: int = 50
+    # Event-loop lag watchdog: stalls past the threshold have the loop thread's stack captured
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.1
+    LOOP_BLOCK_THRESHOLD_SECONDS: float = 0.1
+    LOOP_BLOCK_LOG_SECONDS: float = 0.5
+    # Per-request SQL statement counts and timings; a shape repeated past the threshold logs an N+1 warning
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_SLOW_QUERY_SECONDS: float = 0.2
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+    # Stack depth recorded per allocation when tracemalloc is started from /admin/memory/start
+    TRACEMALLOC_FRAMES: int = 10
+    
+    # Live meeting state (profile, prompt, recent turns) is dropped after this much idle time
+    MEETING_SESSION_IDLE_SECONDS: int = 900
+    
     class Config:
         env_file = ".env"
 
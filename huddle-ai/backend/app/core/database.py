@@ -1,10 +1,104 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from typing import Optional
+import itertools
+import threading
+import time
 from .config import settings
+from .query_stats import instrument_engine
 
 engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_engine(engine)
+
+class ReplicaPool:
+    """Round-robin over read replicas that are reachable and within the lag threshold"""
+
+    def __init__(self, urls, max_lag_seconds: int, check_interval_seconds: int):
+        self.engines = [create_engine(url, pool_pre_ping=True) for url in urls]
+        for replica in self.engines:
+            instrument_engine(replica)
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._healthy = {id(replica): True for replica in self.engines}
+        self._checked_at = 0.0
+        self._check_lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def pick(self):
+        """Return a healthy replica engine, or None to fall back to the primary"""
+        if not self.engines:
+            return None
+
+        self._refresh_health()
+        healthy = [replica for replica in self.engines if self._healthy[id(replica)]]
+        if not healthy:
+            return None
+
+        return healthy[next(self._counter) % len(healthy)]
+
+    def _refresh_health(self):
+        if time.monotonic() - self._checked_at < self.check_interval_seconds:
+            return
+
+        # One thread re-checks; everyone else keeps using the last known state
+        if not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            for replica in self.engines:
+                self._healthy[id(replica)] = self._is_healthy(replica)
+            self._checked_at = time.monotonic()
+        finally:
+            self._check_lock.release()
+
+    def _is_healthy(self, replica) -> bool:
+        try:
+            with replica.connect() as conn:
+                lag = self._replication_lag(conn)
+        except Exception as e:
+            print(f"Replica {replica.url.host} health check failed: {e}")
+            return False
+
+        if lag is None or lag > self.max_lag_seconds:
+            print(f"Replica {replica.url.host} lagging ({lag}s), routing reads to primary")
+            return False
+        return True
+
+    def _replication_lag(self, conn) -> Optional[int]:
+        if conn.dialect.name != "mysql":
+            return 0
+
+        # SHOW REPLICA STATUS is MySQL 8.0.22+, SHOW SLAVE STATUS covers older servers
+        for statement in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+            try:
+                status = conn.execute(text(statement)).mappings().first()
+            except Exception:
+                continue
+            if status is None:
+                return None  # Replication is not configured on this server
+            # NULL while the SQL thread is stopped
+            return status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+        return None
+
+replica_pool = ReplicaPool(
+    settings.DATABASE_REPLICA_URLS,
+    settings.REPLICA_MAX_LAG_SECONDS,
+    settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS
+)
+
+class RoutingSession(Session):
+    """Sends read-only sessions to a replica; flushes and normal sessions go to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and not self._flushing:
+            # Pin one replica per session so a request sees a consistent snapshot
+            if "replica" not in self.info:
+                self.info["replica"] = replica_pool.pick()
+            if self.info["replica"] is not None:
+                return self.info["replica"]
+        return engine
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
@@ -13,4 +107,15 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    """Session for GET handlers and lookups that never write"""
+    db = SessionLocal(info={"read_only": True})
+    try:
+        yield db
+    finally:
+        db.close()
+
+def is_replica_session(db: Session) -> bool:
+    return db.info.get("replica") is not None
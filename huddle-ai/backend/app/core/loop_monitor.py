@@ -0,0 +1,202 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from .config import settings
+from .profiling import running_tasks
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Upper bounds of the lag histogram buckets, in milliseconds
+LAG_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf")]
+MAX_SITES = 500
+EXAMPLE_STACK_DEPTH = 30
+
+class BlockingSite:
+    """Stalls attributed to one line of application code"""
+
+    def __init__(self, site: str):
+        self.site = site
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.leaf = ""
+        self.task = ""
+        self.stack: List[str] = []
+
+    def as_dict(self) -> dict:
+        return {
+            "site": self.site,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 1),
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "leaf": self.leaf,
+            "task": self.task,
+            "example_stack": self.stack,
+        }
+
+class LoopMonitor:
+    """Measures event-loop lag and records what the loop was running when it stalled.
+
+    A heartbeat coroutine sleeps LOOP_LAG_INTERVAL_SECONDS and records how late
+    it wakes up. A watchdog thread notices when the heartbeat is overdue by
+    LOOP_BLOCK_THRESHOLD_SECONDS. It then captures the loop thread's stack
+    while the blocking call is still on it. Stalls are ranked by the innermost
+    frame in this app, i.e. the line that made the blocking call.
+    """
+
+    def __init__(self, interval: float, threshold: float, log_threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.log_threshold = log_threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = time.monotonic()
+        # (heartbeat it belongs to, stack summary) captured by the watchdog
+        self._pending: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._buckets = [0] * len(LAG_BUCKETS_MS)
+            self._samples = 0
+            self._lag_total = 0.0
+            self._lag_max = 0.0
+            self._stalls = 0
+            self._unattributed = 0
+            self._sites: Dict[str, BlockingSite] = {}
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        print(f"Event loop monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self, limit: int = 20) -> dict:
+        with self._lock:
+            sites = sorted(self._sites.values(), key=lambda site: site.total_seconds, reverse=True)
+            return {
+                "threshold_ms": self.threshold * 1000,
+                "samples": self._samples,
+                "lag_mean_ms": round(self._lag_total / self._samples * 1000, 2) if self._samples else 0.0,
+                "lag_max_ms": round(self._lag_max * 1000, 1),
+                "stalls": self._stalls,
+                # Stalls too short for the watchdog to catch in the act
+                "stalls_unattributed": self._unattributed,
+                "histogram": [
+                    {"le_ms": bound if bound != float("inf") else "+Inf", "count": count}
+                    for bound, count in zip(LAG_BUCKETS_MS, self._buckets)
+                ],
+                "top_sites": [site.as_dict() for site in sites[:limit]],
+            }
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "lag_max_ms": round(self._lag_max * 1000, 1),
+                "stalls": self._stalls,
+            }
+
+    async def _heartbeat(self):
+        while True:
+            before = time.monotonic()
+            self._last_beat = before
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            # Mark the loop alive before recording, so the watchdog does not catch the heartbeat itself
+            self._last_beat = now
+            self._record(before, max(now - before - self.interval, 0.0))
+
+    def _record(self, beat: float, lag: float):
+        with self._lock:
+            self._samples += 1
+            self._lag_total += lag
+            self._lag_max = max(self._lag_max, lag)
+            lag_ms = lag * 1000
+            for index, bound in enumerate(LAG_BUCKETS_MS):
+                if lag_ms <= bound:
+                    self._buckets[index] += 1
+                    break
+
+            if lag < self.threshold:
+                return
+            self._stalls += 1
+
+            pending, self._pending = self._pending, None
+            if pending is None or pending[0] != beat:
+                self._unattributed += 1
+                return
+
+            site_name, leaf, task_name, stack = pending[1]
+            site = self._sites.get(site_name)
+            if site is None:
+                if len(self._sites) >= MAX_SITES:
+                    self._unattributed += 1
+                    return
+                site = self._sites[site_name] = BlockingSite(site_name)
+            site.count += 1
+            site.total_seconds += lag
+            if lag >= site.max_seconds:
+                site.max_seconds = lag
+                site.leaf, site.task, site.stack = leaf, task_name, stack
+
+        if lag >= self.log_threshold:
+            print(f"Event loop blocked for {lag * 1000:.0f} ms at {site_name} ({leaf}) in task {task_name}")
+
+    def _watch(self):
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._last_beat
+            if time.monotonic() - beat < self.interval + self.threshold:
+                continue
+            pending = self._pending
+            if pending is not None and pending[0] == beat:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            task = running_tasks().get(self._loop)
+            task_name = task.get_name() if task is not None else "<callback>"
+            self._pending = (beat, self._summarize(frame, task_name))
+
+    def _summarize(self, frame, task_name: str) -> tuple:
+        """(app call site, leaf frame, task name, leaf-first stack) of the loop thread"""
+        site = None
+        stack = []
+        leaf = None
+        while frame is not None:
+            code = frame.f_code
+            label = f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+            if leaf is None:
+                leaf = label
+            if site is None and code.co_filename.startswith(APP_DIR) and code.co_filename != __file__:
+                site = f"{os.path.relpath(code.co_filename, APP_DIR)}:{frame.f_lineno} {code.co_name}"
+            if len(stack) < EXAMPLE_STACK_DEPTH:
+                stack.append(label)
+            frame = frame.f_back
+        return site or "<outside app code>", leaf, task_name, stack
+
+loop_monitor = LoopMonitor(
+    settings.LOOP_LAG_INTERVAL_SECONDS,
+    settings.LOOP_BLOCK_THRESHOLD_SECONDS,
+    settings.LOOP_BLOCK_LOG_SECONDS
+)
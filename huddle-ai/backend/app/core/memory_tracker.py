@@ -0,0 +1,189 @@
+from typing import Dict, Optional
+import linecache
+import re
+import threading
+import time
+import tracemalloc
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .config import settings
+
+# Allocations made by tracemalloc itself and the import system are noise in a diff
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+# Every audio route, plus chat messages, send and generate-response; the SSE stream never ends
+TRACKED_PATHS = [
+    re.compile(r"^/audio/[^/]+/[^/]+$"),
+    re.compile(r"^/chat/[^/]+/(messages|send|generate-response)$"),
+]
+
+class RouteMemoryStats:
+    """Peak and retained allocation of one route's requests while tracing"""
+
+    def __init__(self):
+        self.requests = 0
+        self.overlapped = 0
+        self.peak_total = 0
+        self.peak_max = 0
+        self.retained_total = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            # Overlapping requests share the process-wide peak, so theirs is an upper bound
+            "overlapped": self.overlapped,
+            "peak_avg_bytes": self.peak_total // self.requests if self.requests else 0,
+            "peak_max_bytes": self.peak_max,
+            # Consistently positive means the route leaves memory behind
+            "retained_avg_bytes": self.retained_total // self.requests if self.requests else 0,
+        }
+
+class MemoryTracker:
+    """tracemalloc control for the admin routes, plus per-request peaks for tracked routes.
+
+    Nothing is measured (and each request pays one is_tracing() call) until
+    tracing is started through /admin/memory/start.
+    """
+
+    def __init__(self, frames: int):
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._started_at: Optional[float] = None
+        self._routes: Dict[str, RouteMemoryStats] = {}
+        self._in_flight = 0
+        # Snapshots can take seconds; request bookkeeping on the event loop must not wait for them
+        self._snapshot_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def start(self, frames: Optional[int] = None) -> dict:
+        with self._snapshot_lock:
+            if not tracemalloc.is_tracing():
+                with self._lock:
+                    self._routes = {}
+                tracemalloc.start(frames or self.frames)
+                self._started_at = time.time()
+            self._baseline = self._take_snapshot()
+            self._previous = self._baseline
+        return self.status()
+
+    def stop(self) -> dict:
+        with self._snapshot_lock:
+            tracemalloc.stop()
+            self._baseline = None
+            self._previous = None
+            self._started_at = None
+        return self.status()
+
+    def snapshot(self, compare_to: str, group_by: str, limit: int, reset_baseline: bool) -> dict:
+        """Diff a new snapshot against the baseline or the previous snapshot, largest growth first"""
+        with self._snapshot_lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not running")
+            snapshot = self._take_snapshot()
+            reference = self._baseline if compare_to == "baseline" else self._previous
+            stats = snapshot.compare_to(reference, group_by)
+            self._previous = snapshot
+            if reset_baseline:
+                self._baseline = snapshot
+
+        return {
+            "compare_to": compare_to,
+            "group_by": group_by,
+            "total_bytes": sum(stat.size for stat in stats),
+            "total_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": [self._format_stat(stat, group_by) for stat in stats[:limit]],
+        }
+
+    def status(self) -> dict:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with self._lock:
+            routes = {route: stats.as_dict() for route, stats in sorted(self._routes.items())}
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "started_at": self._started_at,
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "routes": routes,
+        }
+
+    def begin_request(self) -> Optional[tuple]:
+        if not tracemalloc.is_tracing():
+            return None
+        with self._lock:
+            if self._in_flight == 0:
+                # Only reset the process-wide peak when no other tracked request depends on it
+                tracemalloc.reset_peak()
+            self._in_flight += 1
+            return tracemalloc.get_traced_memory()[0], self._in_flight > 1
+
+    def end_request(self, route: str, token: tuple):
+        start_current, overlapped = token
+        with self._lock:
+            self._in_flight -= 1
+            if not tracemalloc.is_tracing():
+                return
+            current, peak = tracemalloc.get_traced_memory()
+            overlapped = overlapped or self._in_flight > 0
+
+            stats = self._routes.setdefault(route, RouteMemoryStats())
+            peak_bytes = max(peak - start_current, 0)
+            stats.requests += 1
+            stats.overlapped += int(overlapped)
+            stats.peak_total += peak_bytes
+            stats.peak_max = max(stats.peak_max, peak_bytes)
+            stats.retained_total += current - start_current
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def _format_stat(self, stat: tracemalloc.StatisticDiff, group_by: str) -> dict:
+        frame = stat.traceback[0]
+        entry = {
+            "file": frame.filename,
+            "line": frame.lineno if group_by != "filename" else None,
+            "size_bytes": stat.size,
+            "size_diff_bytes": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        }
+        if group_by == "traceback":
+            entry["traceback"] = stat.traceback.format()
+        return entry
+
+memory_tracker = MemoryTracker(settings.TRACEMALLOC_FRAMES)
+
+class MemoryTrackingMiddleware:
+    """Records the peak and retained allocation of TRACKED_PATHS requests under their route while tracing.
+
+    It wraps the whole request, so multipart uploads (parsed before any
+    dependency runs) and the buffered response body are both counted.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or not tracemalloc.is_tracing()
+                or not any(pattern.match(scope["path"]) for pattern in TRACKED_PATHS)):
+            await self.app(scope, receive, send)
+            return
+
+        token = memory_tracker.begin_request()
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            memory_tracker.end_request(f"{scope['method']} {getattr(route, 'path', scope['path'])}", token)
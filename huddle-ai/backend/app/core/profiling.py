@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+MAX_STACK_DEPTH = 128
+# Leaf frames of threads parked waiting for work; these are not time spent on anything
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+def running_tasks() -> dict:
+    # asyncio's loop -> running task map; read from the sampler thread to attribute loop samples
+    return getattr(asyncio.tasks, "_current_tasks", {})
+
+class ProfileSession:
+    """Stack samples collected for one request or one time window"""
+
+    def __init__(self, name: str, task: Optional[asyncio.Task] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        self.interval = settings.PROFILER_SAMPLE_INTERVAL_SECONDS
+        # Request mode: event-loop samples count only while the request's own task is running
+        self.task = task
+        self.loop = task.get_loop() if task is not None else None
+        self.loop_thread_id = threading.get_ident() if task is not None else None
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration,
+            "samples": self.samples,
+            "interval_seconds": self.interval,
+        }
+
+class StackSampler:
+    """Samples every thread's Python stack with sys._current_frames.
+
+    The sampling thread runs only while at least one session is recording, so
+    with profiling unused the cost is nothing. Sessions older than
+    PROFILER_MAX_WINDOW_SECONDS stop collecting until they are stopped.
+    """
+
+    def __init__(self, max_sessions: int, max_seconds: float, keep_profiles: int):
+        self.max_sessions = max_sessions
+        self.max_seconds = max_seconds
+        self.keep_profiles = keep_profiles
+        self._sessions: List[ProfileSession] = []
+        self._finished: "OrderedDict[str, ProfileSession]" = OrderedDict()
+        self._labels: Dict = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, session: ProfileSession) -> bool:
+        """Begin recording; False when PROFILER_MAX_SESSIONS are already running"""
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                return False
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return True
+
+    def stop(self, session: ProfileSession):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+            session.duration = time.time() - session.started_at
+            self._finished[session.id] = session
+            while len(self._finished) > self.keep_profiles:
+                self._finished.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[ProfileSession]:
+        with self._lock:
+            return self._finished.get(session_id)
+
+    def recent(self) -> List[dict]:
+        with self._lock:
+            return [session.summary() for session in reversed(self._finished.values())]
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                now = time.time()
+                sessions = [s for s in self._sessions if now - s.started_at < self.max_seconds]
+                interval = min(s.interval for s in self._sessions)
+
+            if sessions:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                running = running_tasks()
+                samples = []
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stack = self._stack(frame)
+                    if stack is None:
+                        continue
+                    key = (f"thread {thread_names.get(thread_id, thread_id)}",) + stack
+                    for session in sessions:
+                        if (session.task is not None and thread_id == session.loop_thread_id
+                                and running.get(session.loop) is not session.task):
+                            continue
+                        samples.append((session, key))
+
+                # Counted under the lock and only for sessions still recording, so a
+                # stopped session's Counter is never changed while it is being rendered
+                with self._lock:
+                    for session, key in samples:
+                        if session in self._sessions:
+                            session.stacks[key] += 1
+                            session.samples += 1
+
+            time.sleep(interval)
+
+    def _stack(self, frame) -> Optional[Tuple[str, ...]]:
+        """Root-first frame labels, or None for a thread that is parked"""
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            return None
+
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return tuple(labels)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # Last two path parts keep labels short but tell app/ from site-packages apart
+            path = "/".join(code.co_filename.replace("\\", "/").split("/")[-2:])
+            label = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+
+def to_collapsed(session: ProfileSession) -> str:
+    """Brendan Gregg's folded format, one "frame;frame;... count" line per stack"""
+    return "\n".join(f"{';'.join(stack)} {count}" for stack, count in session.stacks.most_common()) + "\n"
+
+def to_speedscope(session: ProfileSession) -> dict:
+    """speedscope.app sampled profile, one profile per thread"""
+    frame_index: Dict[str, int] = {}
+    frames = []
+    profiles: Dict[str, dict] = {}
+
+    for stack, count in session.stacks.most_common():
+        thread, path = stack[0], stack[1:]
+        indices = []
+        for label in path:
+            if label not in frame_index:
+                frame_index[label] = len(frames)
+                name, _, location = label.rpartition(" (")
+                file, _, line = location.rstrip(")").rpartition(":")
+                frames.append({"name": name, "file": file, "line": int(line)})
+            indices.append(frame_index[label])
+
+        profile = profiles.setdefault(thread, {
+            "type": "sampled",
+            "name": thread,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": 0,
+            "samples": [],
+            "weights": [],
+        })
+        weight = count * session.interval
+        profile["samples"].append(indices)
+        profile["weights"].append(weight)
+        profile["endValue"] += weight
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": session.name,
+        "exporter": "huddle-ai",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": list(profiles.values()),
+    }
+
+def _token_signature(expires: int, method: str, path: str) -> str:
+    message = f"{expires}:{method.upper()}:{path}".encode("utf-8")
+    return hmac.new(settings.ADMIN_API_KEY.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+def sign_profile_request(method: str, path: str, ttl_seconds: int) -> Tuple[str, int]:
+    """X-Profile-Token value that profiles requests to one method and path until it expires"""
+    expires = int(time.time()) + ttl_seconds
+    return f"{expires}.{_token_signature(expires, method, path)}", expires
+
+def verify_profile_token(token: str, method: str, path: str) -> bool:
+    if not settings.ADMIN_API_KEY:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _token_signature(int(expires), method, path))
+
+class ProfilingMiddleware:
+    """Samples requests that carry a valid X-Profile-Token; the profile id comes back in X-Profile-Id.
+
+    Event-loop samples are limited to the request's own task. Worker-thread
+    samples (to_thread, threadpool dependencies) cover every request running
+    at the same time, since a thread does not say which request it serves.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = Headers(scope=scope).get(PROFILE_TOKEN_HEADER)
+        if not token or not verify_profile_token(token, scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(f"{scope['method']} {scope['path']}", task=asyncio.current_task())
+        if not stack_sampler.start(session):
+            print(f"Profiling skipped for {session.name}: too many sessions running")
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_profile_id(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Id"] = session.id
+                headers.append("Access-Control-Expose-Headers", "X-Profile-Id")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            stack_sampler.stop(session)
+
+stack_sampler = StackSampler(
+    settings.PROFILER_MAX_SESSIONS,
+    settings.PROFILER_MAX_WINDOW_SECONDS,
+    settings.PROFILER_KEEP_PROFILES
+)
@@ -0,0 +1,192 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+
+MAX_SHAPES = 1000
+MAX_LOGGED_STATEMENT = 300
+_WHITESPACE = re.compile(r"\s+")
+# Expanding IN lists differ only in their number of placeholders
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?|%\(\w+\)s|:\w+)\s*,?)+\)", re.IGNORECASE)
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+def _value_shape(value) -> str:
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    """Types and sizes of bound parameters, never their values"""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0], False)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {_value_shape(value)}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_value_shape(value) for value in parameters) + ")"
+    return _value_shape(parameters)
+
+class RequestQueryStats:
+    """Statements run on behalf of one HTTP request, including its threadpool work"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+        self.route: Optional[str] = None
+        # Background tasks spawned by the request inherit this object; stop counting once it is done
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, shape: str, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.shapes[shape] += 1
+
+class QueryStats:
+    """Per-statement-shape and per-route totals for this worker"""
+
+    def __init__(self, slow_seconds: float, repeat_threshold: int):
+        self.slow_seconds = slow_seconds
+        self.repeat_threshold = repeat_threshold
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._shapes: Dict[str, list] = {}
+            self._routes: Dict[str, dict] = {}
+
+    def record_statement(self, shape: str, seconds: float):
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                if len(self._shapes) >= MAX_SHAPES:
+                    return
+                entry = self._shapes[shape] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def record_request(self, route: str, request_stats: RequestQueryStats):
+        repeated = [(shape, count) for shape, count in request_stats.shapes.most_common()
+                    if count > self.repeat_threshold]
+        for shape, count in repeated:
+            print(f"Possible N+1 in {route}: statement ran {count} times: {shape[:MAX_LOGGED_STATEMENT]}")
+
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0, "queries": 0, "queries_max": 0, "db_seconds": 0.0, "n_plus_one": 0
+            })
+            entry["requests"] += 1
+            entry["queries"] += request_stats.count
+            entry["queries_max"] = max(entry["queries_max"], request_stats.count)
+            entry["db_seconds"] += request_stats.seconds
+            entry["n_plus_one"] += int(bool(repeated))
+
+    def report(self, limit: int) -> dict:
+        with self._lock:
+            routes = {
+                route: {
+                    "requests": entry["requests"],
+                    "queries_avg": round(entry["queries"] / entry["requests"], 2),
+                    "queries_max": entry["queries_max"],
+                    "db_ms_avg": round(entry["db_seconds"] / entry["requests"] * 1000, 2),
+                    "requests_with_n_plus_one": entry["n_plus_one"],
+                }
+                for route, entry in sorted(self._routes.items())
+            }
+            shapes = sorted(self._shapes.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return {
+            "routes": routes,
+            "top_statements": [
+                {
+                    "statement": shape,
+                    "count": count,
+                    "total_ms": round(total * 1000, 1),
+                    "max_ms": round(longest * 1000, 1),
+                }
+                for shape, (count, total, longest) in shapes
+            ],
+        }
+
+query_stats = QueryStats(settings.SQL_SLOW_QUERY_SECONDS, settings.SQL_N_PLUS_ONE_THRESHOLD)
+current_request_queries: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_request_queries", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    shape = statement_shape(statement)
+    query_stats.record_statement(shape, elapsed)
+    request_stats = current_request_queries.get()
+    if request_stats is not None and not request_stats.closed:
+        request_stats.add(shape, elapsed)
+
+    if elapsed >= query_stats.slow_seconds:
+        route = request_stats.route if request_stats is not None else "background task"
+        print(
+            f"Slow query {elapsed * 1000:.0f} ms in {route}: {shape[:MAX_LOGGED_STATEMENT]} "
+            f"params={parameter_shape(parameters, executemany)}"
+        )
+
+def instrument_engine(engine):
+    """Time every statement the engine runs; attach to the primary and each replica"""
+    if not settings.SQL_INSTRUMENTATION_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class QueryStatsMiddleware:
+    """Counts each request's statements; the totals go out in a Server-Timing header.
+
+    Statements run after the response starts (yield dependencies) still count
+    towards the route totals; tasks that outlive the request do not.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_stats = RequestQueryStats()
+        request_stats.route = f"{scope['method']} {scope['path']}"
+        reset_token = current_request_queries.set(request_stats)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                request_stats.route = _route_name(scope)
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={request_stats.seconds * 1000:.1f};desc="{request_stats.count} queries"'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_queries.reset(reset_token)
+            request_stats.closed = True
+            query_stats.record_request(_route_name(scope), request_stats)
+
+def _route_name(scope: Scope) -> str:
+    # The router stores the matched route in the shared scope; unmatched paths share one bucket
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', '<unmatched>')}"
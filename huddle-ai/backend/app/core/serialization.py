@@ -0,0 +1,29 @@
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from typing import Iterable, List, Optional, Type
+
+class ListSerializer:
+    """JSON encoder for List[schema], built once per schema at import time.
+
+    Rows from our own ORM queries are trusted, so they are copied into the
+    schema with model_construct (no validation) and dumped by the compiled
+    TypeAdapter serializer straight to bytes.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+        self.adapter = TypeAdapter(List[schema])
+
+    def to_json(self, rows: Iterable) -> bytes:
+        construct = self.schema.model_construct
+        fields = self.fields
+        items = [construct(**{field: getattr(row, field, None) for field in fields}) for row in rows]
+        return self.adapter.dump_json(items)
+
+    def response(self, rows: Iterable, response: Optional[Response] = None) -> Response:
+        """Response carrying headers already set on the injected `response` (e.g. the ETag)"""
+        headers = dict(response.headers) if response is not None else None
+        if headers:
+            headers.pop("content-length", None)
+        return Response(content=self.to_json(rows), media_type="application/json", headers=headers)
@@ -0,0 +1,276 @@
+"""Closed-loop load generator for a running Huddle.ai server.
+
+Each virtual user registers, logs in and creates an AI profile. It then runs
+coaching sessions back to back until the run ends. A session creates a
+meeting, starts it, takes N chat and voice turns with think time in between,
+and ends it. Start the server with fake providers so the run makes no
+Together or Deepgram calls:
+
+    FAKE_PROVIDERS=true uvicorn app.main:app --port 8000
+    python -m app.loadgen --base-url http://localhost:8000 --users 50 --duration 120
+
+This module only talks HTTP and never imports the app, so it can run on another machine.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import random
+import time
+import uuid
+import wave
+from typing import Dict, List, Optional
+
+import httpx
+
+CHAT_MESSAGES = [
+    "I have a hard conversation with a direct report tomorrow. How do I prepare?",
+    "How do I say no to my manager without sounding uncooperative?",
+    "Our planning meetings run long and nobody leaves with decisions.",
+    "What is a good first 30 days plan for a new team lead?",
+    "I get nervous presenting to executives. Any techniques?",
+]
+# Same preference order the web client sends
+AUDIO_ACCEPT = "audio/ogg, audio/mpeg;q=0.9, audio/wav;q=0.5"
+SAMPLE_RATE = 16000
+
+def make_wav(seconds: float) -> bytes:
+    """Mono 16-bit WAV of noise, sized like a recorded utterance"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(random.randbytes(int(seconds * SAMPLE_RATE) * 2))
+    return buffer.getvalue()
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+class LoadStats:
+    """Latencies and failures per endpoint, keyed by method and route template"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.error_samples: Dict[str, str] = {}
+        self.sessions_completed = 0
+        self.turns_completed = 0
+
+    def record(self, endpoint: str, seconds: float, error: Optional[str] = None):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        if error is not None:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            self.error_samples.setdefault(endpoint, error)
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            errors = self.errors.get(endpoint, 0)
+            endpoints[endpoint] = {
+                "count": len(values),
+                "errors": errors,
+                "error_rate": errors / len(values),
+                "throughput_rps": len(values) / elapsed,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+                "first_error": self.error_samples.get(endpoint),
+            }
+
+        total = sum(len(values) for values in self.latencies.values())
+        total_errors = sum(self.errors.values())
+        return {
+            "elapsed_seconds": elapsed,
+            "requests": total,
+            "errors": total_errors,
+            "error_rate": total_errors / total if total else 0.0,
+            "throughput_rps": total / elapsed,
+            "sessions_completed": self.sessions_completed,
+            "sessions_per_minute": self.sessions_completed / elapsed * 60,
+            "turns_completed": self.turns_completed,
+            "endpoints": endpoints,
+        }
+
+def print_report(report: dict):
+    width = max([len(name) for name in report["endpoints"]] + [8])
+    print(f"\n{'endpoint':<{width}}{'count':>8}{'err%':>7}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, row in report["endpoints"].items():
+        print(
+            f"{name:<{width}}{row['count']:>8}{row['error_rate'] * 100:>6.1f}%{row['throughput_rps']:>8.2f}"
+            f"{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['p99_ms']:>9.0f}{row['max_ms']:>9.0f}"
+        )
+
+    print(
+        f"\n{report['requests']} requests in {report['elapsed_seconds']:.1f}s "
+        f"({report['throughput_rps']:.2f} req/s), error rate {report['error_rate'] * 100:.2f}%"
+    )
+    print(
+        f"{report['sessions_completed']} sessions completed "
+        f"({report['sessions_per_minute']:.1f}/min), {report['turns_completed']} turns"
+    )
+    for name, row in report["endpoints"].items():
+        if row["first_error"]:
+            print(f"  first error on {name}: {row['first_error']}")
+
+class VirtualUser:
+    """One simulated person: an account, a coach, and back-to-back sessions"""
+
+    def __init__(self, index: int, client: httpx.AsyncClient, stats: LoadStats, args, run_id: str, audio: List[bytes]):
+        self.index = index
+        self.client = client
+        self.stats = stats
+        self.args = args
+        self.run_id = run_id
+        self.audio = audio
+        self.random = random.Random(f"{args.seed}-{index}")
+        self.headers: Dict[str, str] = {}
+        self.profile_id: Optional[int] = None
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Time one call; returns None on transport errors and non-2xx responses"""
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            # Include the body transfer, as a browser would
+            await response.aread()
+        except httpx.HTTPError as e:
+            self.stats.record(endpoint, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+            return None
+
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            self.stats.record(endpoint, elapsed, f"HTTP {response.status_code}: {response.text[:200]}")
+            return None
+        self.stats.record(endpoint, elapsed)
+        return response
+
+    async def think(self):
+        if self.args.think_time > 0:
+            await asyncio.sleep(self.random.uniform(0.5, 1.5) * self.args.think_time)
+
+    async def setup(self) -> bool:
+        email = f"loadgen-{self.run_id}-{self.index}@example.com"
+        password = "loadgen-password"
+        registered = await self.request(
+            "POST /auth/register", "POST", "/auth/register",
+            json={"email": email, "name": f"Load User {self.index}", "password": password}
+        )
+        if registered is None:
+            return False
+
+        login = await self.request(
+            "POST /auth/login", "POST", "/auth/login", json={"email": email, "password": password}
+        )
+        if login is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        profile = await self.request(
+            "POST /ai-profiles/", "POST", "/ai-profiles/",
+            json={
+                "coach_name": f"Load Coach {self.index}",
+                "coach_role": "Leadership Coach",
+                "coach_description": "Practical and encouraging; asks one question at a time.",
+                "domain_expertise": "Engineering management",
+                "gender": self.random.choice(["MALE", "FEMALE"])
+            }
+        )
+        if profile is None:
+            return False
+        self.profile_id = profile.json()["id"]
+        return True
+
+    async def run_session(self):
+        meeting = await self.request(
+            "POST /meetings/", "POST", "/meetings/",
+            json={"title": f"Load session {uuid.uuid4().hex[:8]}", "ai_profile_id": self.profile_id}
+        )
+        if meeting is None:
+            return
+        meeting_uuid = meeting.json()["uuid"]
+
+        if await self.request("PUT /meetings/{uuid}/start", "PUT", f"/meetings/{meeting_uuid}/start") is None:
+            return
+
+        for _ in range(self.args.turns):
+            await self.think()
+            if self.random.random() < self.args.voice_ratio:
+                response = await self.request(
+                    "POST /audio/{uuid}/process", "POST", f"/audio/{meeting_uuid}/process",
+                    headers={"Accept": AUDIO_ACCEPT},
+                    files={"audio_file": ("audio.wav", self.random.choice(self.audio), "audio/wav")}
+                )
+            else:
+                response = await self.request(
+                    "POST /chat/{uuid}/send", "POST", f"/chat/{meeting_uuid}/send",
+                    json={"message": self.random.choice(CHAT_MESSAGES)}
+                )
+            if response is not None:
+                self.stats.turns_completed += 1
+
+        await self.think()
+        if await self.request("PUT /meetings/{uuid}/end", "PUT", f"/meetings/{meeting_uuid}/end") is None:
+            return
+        # The client goes back to the dashboard after a meeting
+        await self.request("GET /meetings/", "GET", "/meetings/")
+        self.stats.sessions_completed += 1
+
+    async def run(self, deadline: float):
+        if not await self.setup():
+            return
+        while time.monotonic() < deadline:
+            await self.run_session()
+
+async def run_load(args) -> dict:
+    stats = LoadStats()
+    run_id = uuid.uuid4().hex[:8]
+    audio = [make_wav(seconds) for seconds in (2.0, 3.5, 5.0)]
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        start = time.monotonic()
+        deadline = start + args.ramp_up + args.duration
+
+        async def start_user(index: int):
+            # Spread arrivals over the ramp-up so registration does not land in one burst
+            await asyncio.sleep(args.ramp_up * index / args.users)
+            await VirtualUser(index, client, stats, args, run_id, audio).run(deadline)
+
+        print(f"Running {args.users} users for {args.duration}s (+{args.ramp_up}s ramp-up) against {args.base_url}")
+        await asyncio.gather(*[start_user(index) for index in range(args.users)])
+        elapsed = time.monotonic() - start
+
+    return stats.report(elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent coaching sessions against a running server")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users (one meeting each at a time)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to keep starting sessions after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=10, help="seconds over which users arrive")
+    parser.add_argument("--turns", type=int, default=6, help="turns per session")
+    parser.add_argument("--voice-ratio", type=float, default=0.5, help="fraction of turns sent as voice")
+    parser.add_argument("--think-time", type=float, default=3.0, help="mean seconds between turns")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", default="loadgen")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+if __name__ == "__main__":
+    main()
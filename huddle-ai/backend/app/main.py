@@ -1,15 +1,26 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
+from .core.compression import CompressionMiddleware
+from .core.memory_tracker import MemoryTrackingMiddleware
+from .core.profiling import ProfilingMiddleware
+from .core.query_stats import QueryStatsMiddleware
 from .core.database import engine, Base
-from .routes import auth, meetings, ai_profiles, chat as chat_routes, audio
+from .core.loop_monitor import loop_monitor
+from .core.security import password_hasher
+from .routes import auth, meetings, ai_profiles, chat as chat_routes, audio, admin
+from .services.chat_buffer import chat_write_buffer
+from .services.ingestion_worker import ingestion_workers
+from .services.profile_reaper import profile_reaper
 import os
 
 # Create FastAPI app first
 app = FastAPI(
     title="Huddle.ai API",
     description="A GenAI-based coaching video call platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -21,6 +32,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON/text responses; audio is kept small by TTS codec negotiation instead
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Counts each request's SQL statements and reports them in Server-Timing
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Outermost, so a profiled request includes compression; only installed when admin is enabled
+if settings.ADMIN_API_KEY:
+    # Per-route memory peaks while tracemalloc runs; wraps body parsing, unlike a dependency
+    app.add_middleware(MemoryTrackingMiddleware)
+    app.add_middleware(ProfilingMiddleware)
+
 # Create tables only once and only if they don't exist
 @app.on_event("startup")
 async def startup_event():
@@ -34,6 +58,20 @@ async def startup_event():
         print("Database tables created successfully")
     except Exception as e:
         print(f"Error during startup: {e}")
+    
+    # Replays orphaned journals, so it must run after the tables exist
+    chat_write_buffer.start()
+    ingestion_workers.start()
+    profile_reaper.start()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await loop_monitor.stop()
+    await profile_reaper.stop()
+    await ingestion_workers.stop()
+    await chat_write_buffer.stop()
 
 # Include routers
 app.include_router(auth.router)
@@ -41,6 +79,7 @@ app.include_router(meetings.router)
 app.include_router(ai_profiles.router)
 app.include_router(chat_routes.router)
 app.include_router(audio.router)
+app.include_router(admin.router)
 
 @app.get("/")
 async def root():
@@ -48,7 +87,12 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "password_hashing": password_hasher.stats(),
+        "knowledge_ingestion": ingestion_workers.stats(),
+        "event_loop": loop_monitor.summary()
+    }
 
 if __name__ == "__main__":
     import uvicorn
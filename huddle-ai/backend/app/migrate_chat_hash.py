@@ -0,0 +1,64 @@
+import sys
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+def migrate_chat_hash():
+    """Add chat_history.content_hash, backfill it and create the dedup index"""
+    try:
+        # Create database connection
+        engine = create_engine(settings.DATABASE_URL)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = SessionLocal()
+        
+        print("Starting chat content hash migration...")
+        
+        column_exists = db.execute(
+            text("SHOW COLUMNS FROM chat_history LIKE 'content_hash'")
+        ).fetchone()
+        if not column_exists:
+            db.execute(text("ALTER TABLE chat_history ADD COLUMN content_hash CHAR(64) NULL AFTER message"))
+            print("Added content_hash column")
+        
+        # SHA2(message, 256) matches compute_content_hash() in models/chat.py
+        total_updated = 0
+        while True:
+            result = db.execute(
+                text("UPDATE chat_history SET content_hash = SHA2(message, 256) WHERE content_hash IS NULL LIMIT 5000")
+            )
+            db.commit()
+            total_updated += result.rowcount
+            if result.rowcount == 0:
+                break
+        print(f"Backfilled content_hash for {total_updated} records")
+        
+        db.execute(text("ALTER TABLE chat_history MODIFY content_hash CHAR(64) NOT NULL"))
+        
+        index_exists = db.execute(
+            text("SHOW INDEX FROM chat_history WHERE Key_name = 'idx_chat_dedup'")
+        ).fetchone()
+        if not index_exists:
+            db.execute(text(
+                "CREATE INDEX idx_chat_dedup ON chat_history (meeting_id, is_user, content_hash, created_at)"
+            ))
+            print("Created idx_chat_dedup index")
+        
+        db.commit()
+        print("Migration completed successfully!")
+        
+        db.close()
+        
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        if 'db' in locals():
+            db.rollback()
+            db.close()
+        raise
+
+if __name__ == "__main__":
+    migrate_chat_hash()
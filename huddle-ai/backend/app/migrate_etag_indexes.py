@@ -0,0 +1,47 @@
+import sys
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+INDEXES = [
+    ("meetings", "idx_meetings_owner_updated", "created_by, updated_at"),
+    ("ai_profiles", "idx_ai_profiles_owner_updated", "created_by, deleted_at, updated_at"),
+]
+
+def migrate_etag_indexes():
+    """Create the covering indexes used by the list endpoint ETags"""
+    try:
+        # Create database connection
+        engine = create_engine(settings.DATABASE_URL)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = SessionLocal()
+        
+        print("Starting ETag index migration...")
+        
+        for table, index_name, columns in INDEXES:
+            index_exists = db.execute(
+                text(f"SHOW INDEX FROM {table} WHERE Key_name = '{index_name}'")
+            ).fetchone()
+            if not index_exists:
+                db.execute(text(f"CREATE INDEX {index_name} ON {table} ({columns})"))
+                print(f"Created {index_name} index")
+        
+        db.commit()
+        print("Migration completed successfully!")
+        
+        db.close()
+        
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        if 'db' in locals():
+            db.rollback()
+            db.close()
+        raise
+
+if __name__ == "__main__":
+    migrate_etag_indexes()
@@ -0,0 +1,78 @@
+import sys
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+def migrate_knowledge_chunks():
+    """Create knowledge_chunks and the AI profile summary/statistics columns"""
+    try:
+        # Create database connection
+        engine = create_engine(settings.DATABASE_URL)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = SessionLocal()
+        
+        print("Starting knowledge chunk migration...")
+        
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS knowledge_chunks (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                blob_sha256 CHAR(64) NOT NULL,
+                chunk_index INT NOT NULL,
+                page_number INT NOT NULL,
+                start_offset INT NOT NULL,
+                end_offset INT NOT NULL,
+                content TEXT NOT NULL,
+                FOREIGN KEY (blob_sha256) REFERENCES pdf_blobs(sha256),
+                INDEX idx_knowledge_blob_chunk (blob_sha256, chunk_index)
+            )
+        """))
+        print("Ensured knowledge_chunks table")
+        
+        blob_column_exists = db.execute(
+            text("SHOW COLUMNS FROM pdf_blobs LIKE 'chunk_count'")
+        ).fetchone()
+        if not blob_column_exists:
+            db.execute(text("ALTER TABLE pdf_blobs ADD COLUMN chunk_count INT NULL AFTER extracted_text"))
+            print("Added pdf_blobs.chunk_count")
+        
+        for column, definition in [
+            ("pdf_summary", "TEXT"),
+            ("pdf_page_count", "INT"),
+            ("pdf_char_count", "INT"),
+            ("pdf_chunk_count", "INT"),
+        ]:
+            column_exists = db.execute(
+                text(f"SHOW COLUMNS FROM ai_profiles LIKE '{column}'")
+            ).fetchone()
+            if not column_exists:
+                db.execute(text(f"ALTER TABLE ai_profiles ADD COLUMN {column} {definition} NULL"))
+                print(f"Added ai_profiles.{column}")
+        
+        # Legacy profiles get a summary so turns no longer read their full text
+        result = db.execute(text("""
+            UPDATE ai_profiles
+            SET pdf_summary = LEFT(TRIM(pdf_content), 1500),
+                pdf_char_count = CHAR_LENGTH(pdf_content)
+            WHERE pdf_content IS NOT NULL AND pdf_summary IS NULL
+        """))
+        print(f"Backfilled summaries for {result.rowcount} profiles")
+        
+        db.commit()
+        print("Migration completed successfully!")
+        
+        db.close()
+        
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        if 'db' in locals():
+            db.rollback()
+            db.close()
+        raise
+
+if __name__ == "__main__":
+    migrate_knowledge_chunks()
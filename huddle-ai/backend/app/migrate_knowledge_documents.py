@@ -0,0 +1,98 @@
+import sys
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+def migrate_knowledge_documents():
+    """Create knowledge_documents and move each profile's single PDF into it.
+
+    The blob reference held by ai_profiles.pdf_sha256 moves to the new
+    document row, so reference counts stay unchanged; the column is dropped.
+    Profiles that only have legacy pdf_content get a ready document without
+    a blob, so their text survives the summary rebuild on the next upload.
+    """
+    try:
+        # Create database connection
+        engine = create_engine(settings.DATABASE_URL)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = SessionLocal()
+        
+        print("Starting knowledge document migration...")
+        
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS knowledge_documents (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                ai_profile_id INT NOT NULL,
+                blob_sha256 CHAR(64),
+                filename VARCHAR(255) NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                error TEXT,
+                summary TEXT,
+                page_count INT,
+                char_count INT,
+                chunk_count INT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                FOREIGN KEY (ai_profile_id) REFERENCES ai_profiles(id) ON DELETE CASCADE,
+                FOREIGN KEY (blob_sha256) REFERENCES pdf_blobs(sha256),
+                INDEX idx_ai_profile_id (ai_profile_id),
+                INDEX idx_blob_sha256 (blob_sha256)
+            )
+        """))
+        print("Ensured knowledge_documents table")
+        
+        column_exists = db.execute(
+            text("SHOW COLUMNS FROM ai_profiles LIKE 'pdf_sha256'")
+        ).fetchone()
+        if column_exists:
+            result = db.execute(text("""
+                INSERT INTO knowledge_documents
+                    (ai_profile_id, blob_sha256, filename, status, summary, page_count, char_count, chunk_count)
+                SELECT id, pdf_sha256, COALESCE(pdf_filename, 'document.pdf'), 'ready',
+                       pdf_summary, pdf_page_count, pdf_char_count, pdf_chunk_count
+                FROM ai_profiles
+                WHERE pdf_sha256 IS NOT NULL
+            """))
+            print(f"Created {result.rowcount} documents from existing profile PDFs")
+            
+            foreign_key = db.execute(text("""
+                SELECT CONSTRAINT_NAME FROM information_schema.KEY_COLUMN_USAGE
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ai_profiles'
+                  AND COLUMN_NAME = 'pdf_sha256' AND REFERENCED_TABLE_NAME IS NOT NULL
+            """)).fetchone()
+            if foreign_key:
+                db.execute(text(f"ALTER TABLE ai_profiles DROP FOREIGN KEY {foreign_key[0]}"))
+            db.execute(text("ALTER TABLE ai_profiles DROP COLUMN pdf_sha256"))
+            print("Dropped ai_profiles.pdf_sha256")
+        
+        result = db.execute(text("""
+            INSERT INTO knowledge_documents
+                (ai_profile_id, filename, status, summary, page_count, char_count, chunk_count)
+            SELECT p.id, COALESCE(p.pdf_filename, 'document.pdf'), 'ready',
+                   COALESCE(p.pdf_summary, LEFT(TRIM(p.pdf_content), 1500)),
+                   p.pdf_page_count, CHAR_LENGTH(p.pdf_content), 0
+            FROM ai_profiles p
+            WHERE p.pdf_content IS NOT NULL AND TRIM(p.pdf_content) != ''
+              AND NOT EXISTS (SELECT 1 FROM knowledge_documents d WHERE d.ai_profile_id = p.id)
+        """))
+        print(f"Created {result.rowcount} documents from legacy profile text")
+        
+        db.commit()
+        print("Migration completed successfully!")
+        
+        db.close()
+        
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        if 'db' in locals():
+            db.rollback()
+            db.close()
+        raise
+
+if __name__ == "__main__":
+    migrate_knowledge_documents()
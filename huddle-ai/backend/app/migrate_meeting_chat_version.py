@@ -0,0 +1,41 @@
+import sys
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+def migrate_meeting_chat_version():
+    """Add meetings.chat_version, the per-meeting stamp live session caches compare on each turn"""
+    try:
+        # Create database connection
+        engine = create_engine(settings.DATABASE_URL)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = SessionLocal()
+        
+        print("Starting meeting chat version migration...")
+        
+        column_exists = db.execute(
+            text("SHOW COLUMNS FROM meetings LIKE 'chat_version'")
+        ).fetchone()
+        if not column_exists:
+            db.execute(text("ALTER TABLE meetings ADD COLUMN chat_version INT NOT NULL DEFAULT 0"))
+            print("Added meetings.chat_version")
+        
+        db.commit()
+        print("Migration completed successfully!")
+        
+        db.close()
+        
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        if 'db' in locals():
+            db.rollback()
+            db.close()
+        raise
+
+if __name__ == "__main__":
+    migrate_meeting_chat_version()
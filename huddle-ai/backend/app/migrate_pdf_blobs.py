@@ -0,0 +1,62 @@
+import sys
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+def migrate_pdf_blobs():
+    """Create pdf_blobs and add ai_profiles.pdf_sha256.
+
+    Existing profiles keep their pdf_content with pdf_sha256 left NULL; they
+    join the blob store the next time a PDF is uploaded to them.
+    """
+    try:
+        # Create database connection
+        engine = create_engine(settings.DATABASE_URL)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = SessionLocal()
+        
+        print("Starting PDF blob store migration...")
+        
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS pdf_blobs (
+                sha256 CHAR(64) PRIMARY KEY,
+                size BIGINT NOT NULL,
+                ref_count INT NOT NULL DEFAULT 0,
+                page_count INT,
+                extracted_text LONGTEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        print("Ensured pdf_blobs table")
+        
+        column_exists = db.execute(
+            text("SHOW COLUMNS FROM ai_profiles LIKE 'pdf_sha256'")
+        ).fetchone()
+        if not column_exists:
+            db.execute(text("ALTER TABLE ai_profiles ADD COLUMN pdf_sha256 CHAR(64) NULL AFTER pdf_filename"))
+            db.execute(text("CREATE INDEX idx_pdf_sha256 ON ai_profiles (pdf_sha256)"))
+            db.execute(text(
+                "ALTER TABLE ai_profiles ADD CONSTRAINT fk_ai_profiles_pdf_sha256 "
+                "FOREIGN KEY (pdf_sha256) REFERENCES pdf_blobs(sha256)"
+            ))
+            print("Added pdf_sha256 column")
+        
+        db.commit()
+        print("Migration completed successfully!")
+        
+        db.close()
+        
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        if 'db' in locals():
+            db.rollback()
+            db.close()
+        raise
+
+if __name__ == "__main__":
+    migrate_pdf_blobs()
@@ -0,0 +1,56 @@
+import sys
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+def migrate_profile_soft_delete():
+    """Add the soft-delete and reaper lease columns to ai_profiles"""
+    try:
+        # Create database connection
+        engine = create_engine(settings.DATABASE_URL)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = SessionLocal()
+        
+        print("Starting AI profile soft delete migration...")
+        
+        for column in ("deleted_at", "deletion_lease_until"):
+            column_exists = db.execute(
+                text(f"SHOW COLUMNS FROM ai_profiles LIKE '{column}'")
+            ).fetchone()
+            if not column_exists:
+                db.execute(text(f"ALTER TABLE ai_profiles ADD COLUMN {column} TIMESTAMP NULL"))
+                print(f"Added ai_profiles.{column}")
+        
+        owner_exists = db.execute(
+            text("SHOW COLUMNS FROM ai_profiles LIKE 'deletion_lease_owner'")
+        ).fetchone()
+        if not owner_exists:
+            db.execute(text("ALTER TABLE ai_profiles ADD COLUMN deletion_lease_owner VARCHAR(32) NULL"))
+            print("Added ai_profiles.deletion_lease_owner")
+        
+        index_exists = db.execute(
+            text("SHOW INDEX FROM ai_profiles WHERE Key_name = 'idx_deleted_at'")
+        ).fetchone()
+        if not index_exists:
+            db.execute(text("CREATE INDEX idx_deleted_at ON ai_profiles (deleted_at)"))
+            print("Created idx_deleted_at index")
+        
+        db.commit()
+        print("Migration completed successfully!")
+        
+        db.close()
+        
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        if 'db' in locals():
+            db.rollback()
+            db.close()
+        raise
+
+if __name__ == "__main__":
+    migrate_profile_soft_delete()
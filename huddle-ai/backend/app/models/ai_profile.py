@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from ..core.database import Base
 
 class AIProfile(Base):
     __tablename__ = "ai_profiles"
+    __table_args__ = (
+        # Serves the version stamp behind the GET /ai-profiles/ ETag
+        Index("idx_ai_profiles_owner_updated", "created_by", "deleted_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -14,13 +18,25 @@ class AIProfile(Base):
     domain_expertise = Column(String(255), nullable=False)
     gender = Column(String(10), nullable=False, default="MALE")  # Simple string field
     user_notes = Column(Text)
-    pdf_content = Column(Text)
+    # Full text of legacy uploads; new uploads live in knowledge_chunks and this stays unloaded
+    pdf_content = deferred(Column(Text))
+    # Filename, summary and counts below aggregate the profile's ready knowledge documents
     pdf_filename = Column(String(255))
+    pdf_summary = Column(Text)
+    pdf_page_count = Column(Integer)
+    pdf_char_count = Column(Integer)
+    pdf_chunk_count = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set by DELETE; the profile reaper purges the profile's rows in the background
+    deleted_at = Column(DateTime(timezone=True), index=True)
+    deletion_lease_until = Column(DateTime(timezone=True))
+    # Token of the reaper pass holding the lease
+    deletion_lease_owner = Column(String(32))
     
     creator = relationship("User", back_populates="ai_profiles")
     meetings = relationship("Meeting", back_populates="ai_profile")
+    documents = relationship("KnowledgeDocument", back_populates="ai_profile")
 
 def normalize_gender(gender_value):
     """Normalize gender value to uppercase"""
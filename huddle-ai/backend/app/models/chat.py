@@ -1,15 +1,25 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
+import hashlib
 
 class ChatHistory(Base):
     __tablename__ = "chat_history"
+    __table_args__ = (
+        # Serves the 10-second duplicate window lookup in add_chat_message
+        Index("idx_chat_dedup", "meeting_id", "is_user", "content_hash", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    meeting_id = Column(Integer, ForeignKey("meetings.id"), nullable=False)
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), nullable=False, index=True)
     message = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=False)
     is_user = Column(Boolean, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    meeting = relationship("Meeting", back_populates="chat_history")
\ No newline at end of file
+    meeting = relationship("Meeting", back_populates="chat_history")
+
+def compute_content_hash(message: str) -> str:
+    """SHA-256 of the cleaned message text (matches MySQL SHA2(message, 256))"""
+    return hashlib.sha256(message.encode("utf-8")).hexdigest()
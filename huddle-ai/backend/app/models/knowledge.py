@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..core.database import Base
+
+class KnowledgeDocument(Base):
+    """One uploaded PDF in a coach profile's knowledge base"""
+    __tablename__ = "knowledge_documents"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    ai_profile_id = Column(Integer, ForeignKey("ai_profiles.id"), nullable=False, index=True)
+    # Set once the content is stored; chunks are shared by every document with the same hash
+    blob_sha256 = Column(String(64), ForeignKey("pdf_blobs.sha256"), index=True)
+    filename = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, processing, ready, failed
+    error = Column(Text)
+    summary = Column(Text)
+    page_count = Column(Integer)
+    char_count = Column(Integer)
+    chunk_count = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    ai_profile = relationship("AIProfile", back_populates="documents")
+
+class KnowledgeChunk(Base):
+    """A slice of one page of an extracted PDF, with its offsets in the full document text"""
+    __tablename__ = "knowledge_chunks"
+    __table_args__ = (
+        Index("idx_knowledge_blob_chunk", "blob_sha256", "chunk_index"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    blob_sha256 = Column(String(64), ForeignKey("pdf_blobs.sha256"), nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    page_number = Column(Integer, nullable=False)
+    start_offset = Column(Integer, nullable=False)
+    end_offset = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
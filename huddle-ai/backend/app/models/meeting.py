@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -12,6 +12,10 @@ class MeetingStatus(enum.Enum):
 
 class Meeting(Base):
     __tablename__ = "meetings"
+    __table_args__ = (
+        # Serves the version stamp behind the GET /meetings/ ETag
+        Index("idx_meetings_owner_updated", "created_by", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(String(36), unique=True, index=True, nullable=False)
@@ -28,7 +32,20 @@ class Meeting(Base):
     action_items = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Grows by the number of chat_history rows inserted; live session caches compare it per turn
+    chat_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     creator = relationship("User", back_populates="meetings")
     ai_profile = relationship("AIProfile", back_populates="meetings")
-    chat_history = relationship("ChatHistory", back_populates="meeting")
\ No newline at end of file
+    chat_history = relationship("ChatHistory", back_populates="meeting")
+
+def bump_chat_version(db, meeting_id: int, inserted: int):
+    """Record `inserted` new chat rows in the caller's transaction.
+
+    updated_at is assigned to itself so the GET /meetings/ ETag does not change on every turn.
+    """
+    if inserted:
+        db.query(Meeting).filter(Meeting.id == meeting_id).update(
+            {"chat_version": Meeting.chat_version + inserted, "updated_at": Meeting.updated_at},
+            synchronize_session=False
+        )
\ No newline at end of file
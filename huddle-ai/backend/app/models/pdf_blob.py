@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class PDFBlob(Base):
+    """Uploaded PDF stored once per SHA-256, shared by every profile that references it"""
+    __tablename__ = "pdf_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    page_count = Column(Integer)
+    # TEXT stops at 64 KB; long PDFs need LONGTEXT, as in the migration
+    extracted_text = Column(Text().with_variant(LONGTEXT, "mysql"))
+    chunk_count = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+import asyncio
+from ..core.config import settings
+from ..core.loop_monitor import loop_monitor
+from ..core.query_stats import query_stats
+from ..core.profiling import (
+    ProfileSession, stack_sampler, sign_profile_request, to_collapsed, to_speedscope
+)
+from ..schemas.admin import ProfileTokenRequest
+from ..services.auth import require_admin
+from ..core.memory_tracker import memory_tracker
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+PROFILE_FORMAT = "^(speedscope|collapsed)$"
+
+def _render_profile(session: ProfileSession, format: str):
+    if format == "collapsed":
+        return PlainTextResponse(
+            to_collapsed(session),
+            headers={"Content-Disposition": f"attachment; filename={session.id}.folded"}
+        )
+    return to_speedscope(session)
+
+@router.post("/profile/token")
+async def create_profile_token(request: ProfileTokenRequest):
+    """Sign a header that profiles requests to one method and path in this deployment"""
+    token, expires = sign_profile_request(request.method, request.path, request.ttl_seconds)
+    return {"header": "X-Profile-Token", "value": token, "expires_at": expires}
+
+@router.post("/profile")
+async def profile_window(
+    seconds: float = Query(10, gt=0, le=settings.PROFILER_MAX_WINDOW_SECONDS),
+    format: str = Query("speedscope", pattern=PROFILE_FORMAT)
+):
+    """Sample every thread of the worker that serves this call for `seconds`"""
+    session = ProfileSession(f"window {seconds:g}s")
+    if not stack_sampler.start(session):
+        raise HTTPException(status_code=409, detail="Too many profiling sessions running")
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stack_sampler.stop(session)
+
+    return _render_profile(session, format)
+
+@router.get("/profiles")
+async def list_profiles():
+    """Recent finished profiles in this worker, newest first"""
+    return stack_sampler.recent()
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("speedscope", pattern=PROFILE_FORMAT)):
+    session = stack_sampler.get(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found in this worker")
+    return _render_profile(session, format)
+
+@router.get("/memory")
+async def memory_status():
+    """tracemalloc state and per-route request peaks in this worker"""
+    return memory_tracker.status()
+
+@router.post("/memory/start")
+async def start_memory_tracing(frames: int = Query(settings.TRACEMALLOC_FRAMES, ge=1, le=100)):
+    """Start tracemalloc (if needed) and take the baseline snapshot"""
+    return await asyncio.to_thread(memory_tracker.start, frames)
+
+@router.post("/memory/stop")
+async def stop_memory_tracing():
+    return memory_tracker.stop()
+
+@router.post("/memory/snapshot")
+async def memory_snapshot(
+    compare_to: str = Query("baseline", pattern="^(baseline|previous)$"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(30, ge=1, le=500),
+    reset_baseline: bool = False
+):
+    """Allocation growth since the baseline (or the previous snapshot), grouped by file or line"""
+    try:
+        return await asyncio.to_thread(memory_tracker.snapshot, compare_to, group_by, limit, reset_baseline)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/loop")
+async def event_loop_stats(limit: int = Query(20, ge=1, le=500)):
+    """Event-loop lag histogram and the call sites that blocked it longest in this worker"""
+    return loop_monitor.stats(limit)
+
+@router.post("/loop/reset")
+async def reset_event_loop_stats():
+    loop_monitor.reset()
+    return loop_monitor.stats(0)
+
+@router.get("/queries")
+async def sql_query_stats(limit: int = Query(20, ge=1, le=500)):
+    """Statements per request by route, and the statement shapes with the most total time"""
+    return query_stats.report(limit)
+
+@router.post("/queries/reset")
+async def reset_sql_query_stats():
+    query_stats.reset()
+    return query_stats.report(0)
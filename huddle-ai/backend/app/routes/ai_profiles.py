@@ -1,16 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
-from ..core.database import get_db
+from datetime import datetime
+from ..core.database import get_db, get_read_db
+from ..core.serialization import ListSerializer
 from ..schemas.ai_profile import AIProfile, AIProfileCreate, AIProfileUpdate
+from ..schemas.knowledge import KnowledgeChunk, KnowledgeDocument
 from ..services.auth import get_current_user
+from ..services.knowledge_service import knowledge_service
+from ..services.etag import ai_profiles_etag
+from ..services.ingestion_worker import ingestion_workers, IngestionQueueFull
 from ..services.pdf_service import pdf_service
+from ..services.profile_reaper import profile_reaper
+from ..services.session_cache import meeting_sessions
 from ..models.user import User
 from ..models.ai_profile import AIProfile as AIProfileModel, normalize_gender
+from ..models.knowledge import KnowledgeDocument as KnowledgeDocumentModel
 
 router = APIRouter(prefix="/ai-profiles", tags=["ai-profiles"])
 
+ai_profile_list_serializer = ListSerializer(AIProfile)
+
 @router.post("/", response_model=AIProfile)
 async def create_ai_profile(
     profile: AIProfileCreate,
@@ -21,7 +32,8 @@ async def create_ai_profile(
         # Check for duplicate based on name and user
         existing_profile = db.query(AIProfileModel).filter(
             AIProfileModel.coach_name == profile.coach_name,
-            AIProfileModel.created_by == current_user.id
+            AIProfileModel.created_by == current_user.id,
+            AIProfileModel.deleted_at.is_(None)
         ).first()
         
         if existing_profile:
@@ -54,14 +66,15 @@ async def create_ai_profile(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-@router.get("/", response_model=List[AIProfile])
+@router.get("/", response_model=List[AIProfile], dependencies=[Depends(ai_profiles_etag)])
 async def get_my_ai_profiles(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         profiles = db.query(AIProfileModel)\
-            .filter(AIProfileModel.created_by == current_user.id)\
+            .filter(AIProfileModel.created_by == current_user.id, AIProfileModel.deleted_at.is_(None))\
             .distinct()\
             .order_by(AIProfileModel.created_at.desc())\
             .all()
@@ -71,44 +84,38 @@ async def get_my_ai_profiles(
         unique_profiles = []
         for profile in profiles:
             if profile.id not in seen_ids:
-                # Normalize gender for existing records
+                # Normalize gender in the response only; stored values are fixed by migrate_gender.py
                 profile.gender = normalize_gender(profile.gender)
                 seen_ids.add(profile.id)
                 unique_profiles.append(profile)
         
-        # Commit gender normalizations if any changes were made
-        if unique_profiles:
-            db.commit()
-        
-        return unique_profiles
+        return ai_profile_list_serializer.response(unique_profiles, response)
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to fetch profiles: {str(e)}")
 
 @router.get("/{profile_id}", response_model=AIProfile)
 async def get_ai_profile(
     profile_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         profile = db.query(AIProfileModel).filter(
             AIProfileModel.id == profile_id,
-            AIProfileModel.created_by == current_user.id
+            AIProfileModel.created_by == current_user.id,
+            AIProfileModel.deleted_at.is_(None)
         ).first()
         
         if not profile:
             raise HTTPException(status_code=404, detail="AI Profile not found")
         
-        # Normalize gender for consistency
+        # Normalize gender for consistency (response only, this is a read-only session)
         profile.gender = normalize_gender(profile.gender)
-        db.commit()
         
         return profile
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to fetch profile: {str(e)}")
 
 @router.put("/{profile_id}", response_model=AIProfile)
@@ -121,7 +128,8 @@ async def update_ai_profile(
     try:
         profile = db.query(AIProfileModel).filter(
             AIProfileModel.id == profile_id,
-            AIProfileModel.created_by == current_user.id
+            AIProfileModel.created_by == current_user.id,
+            AIProfileModel.deleted_at.is_(None)
         ).first()
         
         if not profile:
@@ -132,7 +140,8 @@ async def update_ai_profile(
             existing_profile = db.query(AIProfileModel).filter(
                 AIProfileModel.coach_name == profile_update.coach_name,
                 AIProfileModel.created_by == current_user.id,
-                AIProfileModel.id != profile_id
+                AIProfileModel.id != profile_id,
+                AIProfileModel.deleted_at.is_(None)
             ).first()
             
             if existing_profile:
@@ -151,6 +160,7 @@ async def update_ai_profile(
         
         db.commit()
         db.refresh(profile)
+        meeting_sessions.invalidate_profile(profile_id)
         return profile
         
     except HTTPException:
@@ -159,41 +169,158 @@ async def update_ai_profile(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
 
-@router.post("/{profile_id}/upload-pdf")
-async def upload_pdf_to_profile(
-    profile_id: int,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+def _get_owned_profile(db: Session, profile_id: int, user_id: int) -> AIProfileModel:
     profile = db.query(AIProfileModel).filter(
         AIProfileModel.id == profile_id,
-        AIProfileModel.created_by == current_user.id
+        AIProfileModel.created_by == user_id,
+        AIProfileModel.deleted_at.is_(None)
     ).first()
     
     if not profile:
         raise HTTPException(status_code=404, detail="AI Profile not found")
-    
+    return profile
+
+async def _enqueue_document(db: Session, profile_id: int, file: UploadFile) -> KnowledgeDocumentModel:
+    """Stream one upload to disk while hashing and queue it for background ingestion"""
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
+    temp_path, sha256, size = await pdf_service.save_upload(file)
+    document = KnowledgeDocumentModel(ai_profile_id=profile_id, filename=file.filename, status="pending")
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+    temp_path = pdf_service.assign_upload(temp_path, document.id)
+    
     try:
-        file_content = await file.read()
-        file_path, extracted_text = await pdf_service.save_and_extract_pdf(file_content, file.filename)
-        
-        if extracted_text:
-            profile.pdf_content = extracted_text
-            profile.pdf_filename = file.filename
-            db.commit()
-            db.refresh(profile)
-            return {"message": "PDF uploaded and processed successfully"}
-        else:
-            raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
+        ingestion_workers.submit(document.id, temp_path, sha256, size)
+    except IngestionQueueFull:
+        db.delete(document)
+        db.commit()
+        pdf_service.delete_pdf(temp_path)
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "5"})
+    
+    return document
+
+@router.post("/{profile_id}/upload-pdf", status_code=202)
+async def upload_pdf_to_profile(
+    profile_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _get_owned_profile(db, profile_id, current_user.id)
+    
+    try:
+        # Adds a document to the profile's knowledge base; clients poll status_url
+        document = await _enqueue_document(db, profile_id, file)
+        
+        return {
+            "message": "PDF accepted for processing",
+            "document_id": document.id,
+            "status_url": f"/ai-profiles/{profile_id}/documents/{document.id}"
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"PDF upload failed: {str(e)}")
 
-@router.delete("/{profile_id}")
+@router.post("/{profile_id}/documents", response_model=List[KnowledgeDocument], status_code=202)
+async def upload_documents(
+    profile_id: int,
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _get_owned_profile(db, profile_id, current_user.id)
+    
+    try:
+        return [await _enqueue_document(db, profile_id, file) for file in files]
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Document upload failed: {str(e)}")
+
+@router.get("/{profile_id}/documents", response_model=List[KnowledgeDocument])
+async def get_documents(
+    profile_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    _get_owned_profile(db, profile_id, current_user.id)
+    
+    return db.query(KnowledgeDocumentModel)\
+        .filter(KnowledgeDocumentModel.ai_profile_id == profile_id)\
+        .order_by(KnowledgeDocumentModel.id)\
+        .all()
+
+@router.get("/{profile_id}/documents/{document_id}", response_model=KnowledgeDocument)
+async def get_document(
+    profile_id: int,
+    document_id: int,
+    # Ingestion status is polled right after upload; read it from the primary, not a lagging replica
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _get_owned_profile(db, profile_id, current_user.id)
+    
+    document = db.query(KnowledgeDocumentModel).filter(
+        KnowledgeDocumentModel.id == document_id,
+        KnowledgeDocumentModel.ai_profile_id == profile_id
+    ).first()
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+@router.delete("/{profile_id}/documents/{document_id}")
+async def delete_document(
+    profile_id: int,
+    document_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _get_owned_profile(db, profile_id, current_user.id)
+    
+    try:
+        document = db.query(KnowledgeDocumentModel).filter(
+            KnowledgeDocumentModel.id == document_id,
+            KnowledgeDocumentModel.ai_profile_id == profile_id
+        ).with_for_update().first()
+        
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        released_path = pdf_service.delete_document(db, document)
+        knowledge_service.refresh_profile_stats(db, profile_id)
+        db.commit()
+        
+        if released_path:
+            pdf_service.delete_pdf(released_path)
+        meeting_sessions.invalidate_profile(profile_id)
+        return {"message": "Document deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
+
+@router.get("/{profile_id}/knowledge", response_model=List[KnowledgeChunk])
+async def get_profile_knowledge(
+    profile_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Page through the extracted document chunks instead of shipping the whole text"""
+    _get_owned_profile(db, profile_id, current_user.id)
+    
+    return knowledge_service.get_profile_chunks(db, profile_id, offset, limit)
+
+@router.delete("/{profile_id}", status_code=202)
 async def delete_ai_profile(
     profile_id: int,
     db: Session = Depends(get_db),
@@ -202,30 +329,62 @@ async def delete_ai_profile(
     try:
         profile = db.query(AIProfileModel).filter(
             AIProfileModel.id == profile_id,
-            AIProfileModel.created_by == current_user.id
+            AIProfileModel.created_by == current_user.id,
+            AIProfileModel.deleted_at.is_(None)
         ).first()
         
         if not profile:
             raise HTTPException(status_code=404, detail="AI Profile not found")
         
-        db.delete(profile)
+        # Soft delete; meetings, chat history and documents are purged by the profile reaper
+        profile.deleted_at = datetime.utcnow()
         db.commit()
-        return {"message": "AI Profile deleted successfully"}
+        
+        meeting_sessions.invalidate_profile(profile_id)
+        return {
+            "message": "AI Profile scheduled for deletion",
+            "status_url": f"/ai-profiles/{profile_id}/deletion"
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
 
+@router.get("/{profile_id}/deletion")
+async def get_profile_deletion_status(
+    profile_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    profile = db.query(AIProfileModel.deleted_at).filter(
+        AIProfileModel.id == profile_id,
+        AIProfileModel.created_by == current_user.id,
+        AIProfileModel.deleted_at.isnot(None)
+    ).first()
+    
+    # The row itself goes last, so a missing profile means the purge finished
+    if not profile:
+        return {"status": "deleted", "remaining": None}
+    
+    return {
+        "status": "deleting",
+        "deleted_at": profile.deleted_at,
+        "remaining": profile_reaper.remaining(db, profile_id)
+    }
+
 @router.get("/{profile_id}/test")
 async def test_profile_fields(
     profile_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Test endpoint to check profile field values"""
     try:
         profile = db.query(AIProfileModel).filter(
             AIProfileModel.id == profile_id,
-            AIProfileModel.created_by == current_user.id
+            AIProfileModel.created_by == current_user.id,
+            AIProfileModel.deleted_at.is_(None)
         ).first()
         
         if not profile:
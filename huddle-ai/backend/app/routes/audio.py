@@ -1,14 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from ..core.database import get_db
-from ..services.auth import get_current_user
-from ..services.meeting_service import meeting_service
-from ..services.deepgram_service import deepgram_service
+from ..services.meeting_context import MeetingContext, get_meeting_context, get_meeting_context_for_read
+from ..services.deepgram_service import deepgram_service, negotiate_audio_format
 from ..services.gemini_service import gemini_service
-from ..models.user import User
-from ..models.ai_profile import AIProfile
-from ..models.chat import ChatHistory
+from ..services.session_cache import meeting_sessions
+from ..services.turn_actor import turn_actors
 import io
 import logging
 
@@ -36,24 +34,14 @@ def sanitize_header_value(text: str) -> str:
 @router.post("/{meeting_uuid}/process")
 async def process_audio(
     meeting_uuid: str,
+    request: Request,
     audio_file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context)
 ):
     logger.info(f"Processing audio for meeting: {meeting_uuid}")
     
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        ai_profile = db.query(AIProfile).filter(AIProfile.id == meeting.ai_profile_id).first()
-        if not ai_profile:
-            raise HTTPException(status_code=404, detail="AI Profile not found")
-        
         # Read and validate audio data
         audio_data = await audio_file.read()
         if len(audio_data) == 0:
@@ -71,85 +59,80 @@ async def process_audio(
         transcript = transcript.strip()
         logger.info(f"Transcription successful: '{transcript}'")
         
-        # Step 2: Save user message to chat
-        logger.info("Step 2: Saving user message...")
-        user_message = meeting_service.add_chat_message(db, meeting.id, transcript, True)
-        logger.info(f"User message saved with ID: {user_message.id}")
-        
-        # Step 3: Get chat history for context (excluding the just-added message)
-        chat_history = db.query(ChatHistory)\
-            .filter(ChatHistory.meeting_id == meeting.id)\
-            .filter(ChatHistory.id != user_message.id)\
-            .order_by(ChatHistory.created_at.desc())\
-            .limit(10)\
-            .all()
-        
-        # Convert to format expected by Gemini service
-        history_data = [
-            {"message": msg.message, "is_user": msg.is_user} 
-            for msg in reversed(chat_history)
-        ]
+        # Step 2: Get chat history for context from the live meeting session
+        session = meeting_sessions.get_or_open(db, meeting)
         
-        logger.info(f"Step 3: Using {len(history_data)} previous messages for context")
-        
-        # Step 4: Generate AI response
-        logger.info("Step 4: Generating AI response...")
-        try:
-            ai_response = gemini_service.generate_response(
-                user_message=transcript,
-                coach_role=ai_profile.coach_role,
-                coach_description=ai_profile.coach_description,
-                domain_expertise=ai_profile.domain_expertise,
-                pdf_content=ai_profile.pdf_content,
-                chat_history=history_data
-            )
+        def generate_reply(history_data):
+            logger.info(f"Step 2: Using {len(history_data)} previous messages for context")
             
-            if not ai_response or not ai_response.strip():
-                ai_response = "I understand what you're saying. Let me help you with that. Could you provide a bit more detail so I can give you the best guidance?"
+            # Step 3: Generate AI response
+            logger.info("Step 3: Generating AI response...")
+            try:
+                ai_response = gemini_service.generate_response(
+                    user_message=transcript,
+                    coach_role=meeting.coach_role,
+                    coach_description=meeting.coach_description,
+                    domain_expertise=meeting.domain_expertise,
+                    pdf_content=meeting.pdf_excerpt,
+                    chat_history=history_data,
+                    prompt_preamble=session.prompt_preamble
+                )
+                
+                if not ai_response or not ai_response.strip():
+                    ai_response = "I understand what you're saying. Let me help you with that. Could you provide a bit more detail so I can give you the best guidance?"
+                
+                ai_response = ai_response.strip()
+                logger.info(f"AI response generated: '{ai_response[:100]}...'")
+                
+            except Exception as e:
+                logger.error(f"Error generating AI response: {e}")
+                ai_response = "I apologize, but I'm having some technical difficulties right now. Let me try to help you with your request."
             
-            ai_response = ai_response.strip()
-            logger.info(f"AI response generated: '{ai_response[:100]}...'")
-            
-        except Exception as e:
-            logger.error(f"Error generating AI response: {e}")
-            ai_response = "I apologize, but I'm having some technical difficulties right now. Let me try to help you with your request."
+            return ai_response
         
-        # Step 5: Save AI response to chat
-        logger.info("Step 5: Saving AI response...")
-        ai_message = meeting_service.add_chat_message(db, meeting.id, ai_response, False)
-        logger.info(f"AI message saved with ID: {ai_message.id}")
+        # Step 4: The meeting's turn actor orders the turn and saves it in the
+        # background while speech is generated
+        turn = await turn_actors.for_meeting(meeting).submit(session, transcript, generate_reply)
+        ai_response = turn.reply
         
-        # Step 6: Generate speech from AI response
-        logger.info("Step 6: Generating speech...")
-        normalized_gender = normalize_gender(ai_profile.gender)
+        # Step 5: Generate speech from AI response
+        logger.info("Step 5: Generating speech...")
+        normalized_gender = normalize_gender(meeting.gender)
         logger.info(f"Using voice for gender: {normalized_gender}")
         
+        # Codec and container follow the client's Accept header (Opus, MP3 or WAV)
+        audio_format = negotiate_audio_format(request.headers.get("accept"))
+        
         try:
-            audio_response = await deepgram_service.text_to_speech(ai_response, normalized_gender)
+            audio_response = await deepgram_service.text_to_speech(ai_response, normalized_gender, audio_format)
             
             if not audio_response or len(audio_response) == 0:
                 logger.error("TTS returned empty response")
                 raise HTTPException(status_code=500, detail="Could not generate speech response - TTS service failed")
             
-            logger.info(f"Generated audio response: {len(audio_response)} bytes")
+            logger.info(f"Generated {audio_format.name} audio response: {len(audio_response)} bytes")
             
         except Exception as tts_error:
             logger.error(f"TTS generation failed: {tts_error}")
             # Return a fallback response without audio
             raise HTTPException(status_code=500, detail=f"Text-to-speech failed: {str(tts_error)}")
         
-        # Step 7: Return audio with metadata
-        logger.info("Step 7: Returning audio response")
+        user_message, ai_message = await turn.persisted
+        logger.info(f"Chat turn saved with IDs: {user_message.id}, {ai_message.id}")
+        
+        # Step 6: Return audio with metadata
+        logger.info("Step 6: Returning audio response")
         return StreamingResponse(
             io.BytesIO(audio_response),
-            media_type="audio/wav",
+            media_type=audio_format.media_type,
             headers={
-                "Content-Disposition": "attachment; filename=response.wav",
+                "Content-Disposition": f"attachment; filename=response.{audio_format.extension}",
+                "Vary": "Accept",
                 "Content-Length": str(len(audio_response)),
                 "X-Transcript": sanitize_header_value(transcript),
                 "X-AI-Response": "Summa",
-                "X-User-Message-ID": str(user_message.id),
-                "X-AI-Message-ID": str(ai_message.id),
+                "X-User-Message-ID": str(user_message.id or ""),
+                "X-AI-Message-ID": str(ai_message.id or ""),
                 "X-Audio-Length": str(len(audio_response)),
                 "Access-Control-Expose-Headers": "X-Transcript,X-AI-Response,X-User-Message-ID,X-AI-Message-ID,X-Audio-Length"
             }
@@ -167,17 +150,10 @@ async def transcribe_audio_only(
     meeting_uuid: str,
     audio_file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context)
 ):
     """Transcribe audio without generating AI response"""
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
         audio_data = await audio_file.read()
         if len(audio_data) == 0:
             raise HTTPException(status_code=400, detail="Empty audio file")
@@ -199,35 +175,27 @@ async def transcribe_audio_only(
 async def synthesize_speech(
     meeting_uuid: str,
     text: str,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context)
 ):
     """Generate speech from text (for testing TTS)"""
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        ai_profile = db.query(AIProfile).filter(AIProfile.id == meeting.ai_profile_id).first()
-        if not ai_profile:
-            raise HTTPException(status_code=404, detail="AI Profile not found")
-        
-        normalized_gender = normalize_gender(ai_profile.gender)
+        normalized_gender = normalize_gender(meeting.gender)
         logger.info(f"Testing TTS with text: '{text[:50]}...' and gender: {normalized_gender}")
         
-        audio_response = await deepgram_service.text_to_speech(text, normalized_gender)
+        audio_format = negotiate_audio_format(request.headers.get("accept"))
+        audio_response = await deepgram_service.text_to_speech(text, normalized_gender, audio_format)
         
         if not audio_response:
             raise HTTPException(status_code=500, detail="Could not generate speech")
         
         return StreamingResponse(
             io.BytesIO(audio_response),
-            media_type="audio/wav",
+            media_type=audio_format.media_type,
             headers={
-                "Content-Disposition": "attachment; filename=synthesized.wav",
+                "Content-Disposition": f"attachment; filename=synthesized.{audio_format.extension}",
+                "Vary": "Accept",
                 "Content-Length": str(len(audio_response))
             }
         )
@@ -241,18 +209,10 @@ async def synthesize_speech(
 @router.get("/{meeting_uuid}/test-tts")
 async def test_tts_service(
     meeting_uuid: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context_for_read)
 ):
     """Test TTS service connectivity"""
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
         # Test TTS connection
         tts_working = await deepgram_service.test_tts_connection()
         
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from ..core.config import settings
 from ..core.database import get_db
-from ..core.security import verify_password, get_password_hash, create_access_token
+from ..core.security import password_hasher, HashingQueueFull, create_access_token
 from ..schemas.user import UserCreate, UserLogin, User, Token
 from ..services.auth import get_user_by_email, create_user, get_current_user
 
@@ -16,7 +17,10 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HashingQueueFull:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
     user_data = {
         "email": user.email,
         "name": user.name,
@@ -29,14 +33,32 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     user = get_user_by_email(db, email=user_credentials.email)
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        try:
+            verified, new_hash = await password_hasher.verify_and_update(
+                user_credentials.password, user.hashed_password
+            )
+        except HashingQueueFull:
+            raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": user.email})
+    # Stored hash used outdated bcrypt parameters; upgrade it transparently
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+    
+    token_data = {"sub": user.email}
+    if settings.JWT_EMBED_USER_ID:
+        token_data["uid"] = user.id
+    
+    access_token = create_access_token(data=token_data)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
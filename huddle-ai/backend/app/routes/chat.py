@@ -1,59 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from ..core.database import get_db
+from typing import List, Optional
+import asyncio
+import json
+from ..core.database import get_db, get_read_db
+from ..core.serialization import ListSerializer
 from ..schemas.chat import ChatMessage, ChatRequest
-from ..services.auth import get_current_user
+from ..services.chat_events import chat_events
+from ..services.etag import chat_history_etag
+from ..services.meeting_context import MeetingContext, get_meeting_context, get_meeting_context_for_read
 from ..services.meeting_service import meeting_service
 from ..services.gemini_service import gemini_service
-from ..models.user import User
-from ..models.ai_profile import AIProfile
-from ..models.chat import ChatHistory
-from datetime import datetime, timedelta
+from ..services.session_cache import meeting_sessions
+from ..services.turn_actor import turn_actors
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-@router.get("/{meeting_uuid}/messages", response_model=List[ChatMessage])
+STREAM_KEEPALIVE_SECONDS = 15
+
+chat_message_list_serializer = ListSerializer(ChatMessage)
+
+@router.get("/{meeting_uuid}/messages", response_model=List[ChatMessage], dependencies=[Depends(chat_history_etag)])
 async def get_chat_history(
     meeting_uuid: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    since_id: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db),
+    meeting: MeetingContext = Depends(get_meeting_context_for_read)
 ):
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        messages = meeting_service.get_chat_history(db, meeting.id)
-        return messages
+        # since_id returns only rows after the client's last seen id
+        messages = meeting_service.get_chat_history(db, meeting.id, since_id)
+        return chat_message_list_serializer.response(messages, response)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch chat history: {str(e)}")
 
+@router.get("/{meeting_uuid}/stream")
+async def stream_chat_messages(
+    meeting_uuid: str,
+    request: Request,
+    since_id: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+    meeting: MeetingContext = Depends(get_meeting_context_for_read)
+):
+    """Server-sent events of new chat messages; resumes from Last-Event-ID or since_id"""
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        since_id = int(last_event_id)
+    
+    # Subscribe before the backfill so nothing saved in between is missed. The backfill reads
+    # the primary: a row published before subscribe() but not yet on a replica would be skipped
+    # for good once a later event moves Last-Event-ID past it
+    queue = chat_events.subscribe(meeting.id)
+    try:
+        backlog = meeting_service.get_chat_history(db, meeting.id, since_id) if since_id is not None else []
+    finally:
+        # Release the connection; the stream can stay open for the whole meeting
+        db.close()
+    
+    async def event_stream():
+        try:
+            last_id = since_id or 0
+            for message in backlog:
+                if message.id is not None:
+                    last_id = max(last_id, message.id)
+                yield _format_event(ChatMessage.model_validate(message).model_dump(mode="json"))
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                # Rows already sent in the backfill are skipped
+                if event["id"] is not None and event["id"] <= last_id:
+                    continue
+                if event["id"] is not None:
+                    last_id = event["id"]
+                yield _format_event(event)
+        finally:
+            chat_events.unsubscribe(meeting.id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _format_event(message: dict) -> str:
+    event_id = f"id: {message['id']}\n" if message.get("id") is not None else ""
+    return f"{event_id}event: message\ndata: {json.dumps(message)}\n\n"
+
 @router.post("/{meeting_uuid}/send")
 async def send_chat_message(
     meeting_uuid: str,
     chat_request: ChatRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context)
 ):
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        ai_profile = db.query(AIProfile).filter(AIProfile.id == meeting.ai_profile_id).first()
-        if not ai_profile:
-            raise HTTPException(status_code=404, detail="AI Profile not found")
-        
         # Clean the user message
         user_message_text = chat_request.message.strip()
         if not user_message_text:
@@ -61,50 +111,40 @@ async def send_chat_message(
         
         print(f"Processing chat message: '{user_message_text}' for meeting {meeting_uuid}")
         
-        # Add user message to chat history
-        user_message = meeting_service.add_chat_message(db, meeting.id, user_message_text, True)
-        print(f"User message saved with ID: {user_message.id}")
-        
-        # Get recent chat history for context (excluding the just-added message to avoid confusion)
-        chat_history = db.query(ChatHistory)\
-            .filter(ChatHistory.meeting_id == meeting.id)\
-            .filter(ChatHistory.id != user_message.id)\
-            .order_by(ChatHistory.created_at.desc())\
-            .limit(10)\
-            .all()
-        
-        # Reverse to get chronological order
-        history_data = [
-            {"message": msg.message, "is_user": msg.is_user} 
-            for msg in reversed(chat_history)
-        ]
+        # Recent turns and the compiled prompt come from the live meeting session
+        session = meeting_sessions.get_or_open(db, meeting)
         
-        print(f"Using {len(history_data)} previous messages for context")
-        
-        # Generate AI response using Gemini
-        try:
-            print("Generating AI response...")
-            ai_response_text = gemini_service.generate_response(
-                user_message=user_message_text,
-                coach_role=ai_profile.coach_role,
-                coach_description=ai_profile.coach_description,
-                domain_expertise=ai_profile.domain_expertise,
-                pdf_content=ai_profile.pdf_content,
-                chat_history=history_data
-            )
-            
-            if not ai_response_text or not ai_response_text.strip():
-                ai_response_text = "I apologize, but I'm having trouble generating a response right now. Could you please rephrase your question?"
+        def generate_reply(history_data):
+            print(f"Using {len(history_data)} previous messages for context")
             
-            print(f"AI response generated: '{ai_response_text[:100]}...'")
+            # Generate AI response using Gemini
+            try:
+                print("Generating AI response...")
+                ai_response_text = gemini_service.generate_response(
+                    user_message=user_message_text,
+                    coach_role=meeting.coach_role,
+                    coach_description=meeting.coach_description,
+                    domain_expertise=meeting.domain_expertise,
+                    pdf_content=meeting.pdf_excerpt,
+                    chat_history=history_data,
+                    prompt_preamble=session.prompt_preamble
+                )
+                
+                if not ai_response_text or not ai_response_text.strip():
+                    ai_response_text = "I apologize, but I'm having trouble generating a response right now. Could you please rephrase your question?"
+                
+                print(f"AI response generated: '{ai_response_text[:100]}...'")
+                
+            except Exception as e:
+                print(f"Error generating AI response: {e}")
+                ai_response_text = "I apologize, but I'm experiencing technical difficulties. Please try again in a moment."
             
-        except Exception as e:
-            print(f"Error generating AI response: {e}")
-            ai_response_text = "I apologize, but I'm experiencing technical difficulties. Please try again in a moment."
+            return ai_response_text.strip()
         
-        # Add AI response to chat history
-        ai_message = meeting_service.add_chat_message(db, meeting.id, ai_response_text.strip(), False)
-        print(f"AI message saved with ID: {ai_message.id}")
+        # The meeting's turn actor orders concurrent turns and persists them in the background
+        turn = await turn_actors.for_meeting(meeting).submit(session, user_message_text, generate_reply)
+        user_message, ai_message = await turn.persisted
+        print(f"Chat turn saved with IDs: {user_message.id}, {ai_message.id}")
         
         # Return both messages for immediate UI update
         return {
@@ -137,36 +177,23 @@ async def generate_ai_response_only(
     meeting_uuid: str,
     chat_request: ChatRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context)
 ):
     """Generate AI response without saving to chat (for testing)"""
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        ai_profile = db.query(AIProfile).filter(AIProfile.id == meeting.ai_profile_id).first()
-        if not ai_profile:
-            raise HTTPException(status_code=404, detail="AI Profile not found")
-        
         # Get recent chat history for context
-        chat_history = meeting_service.get_chat_history(db, meeting.id)
-        history_data = [
-            {"message": msg.message, "is_user": msg.is_user} 
-            for msg in chat_history[-10:]
-        ]
+        session = meeting_sessions.get_or_open(db, meeting)
+        history_data = session.history()
         
         # Generate AI response
         ai_response = gemini_service.generate_response(
             user_message=chat_request.message,
-            coach_role=ai_profile.coach_role,
-            coach_description=ai_profile.coach_description,
-            domain_expertise=ai_profile.domain_expertise,
-            pdf_content=ai_profile.pdf_content,
-            chat_history=history_data
+            coach_role=meeting.coach_role,
+            coach_description=meeting.coach_description,
+            domain_expertise=meeting.domain_expertise,
+            pdf_content=meeting.pdf_excerpt,
+            chat_history=history_data,
+            prompt_preamble=session.prompt_preamble
         )
         
         return {
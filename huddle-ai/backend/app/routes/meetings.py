@@ -1,24 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List
-from ..core.database import get_db
+from ..core.database import get_db, get_read_db
+from ..core.serialization import ListSerializer
 from ..schemas.meeting import Meeting, MeetingCreate, MeetingUpdate
 from ..services.auth import get_current_user
 from ..services.meeting_service import meeting_service
+from ..services.etag import meetings_etag
+from ..services.meeting_context import MeetingContext, get_meeting_context
+from ..services.session_cache import meeting_sessions
+from ..services.turn_actor import turn_actors
 from ..models.user import User
-from ..models.meeting import Meeting as MeetingModel
+from ..models.meeting import Meeting as MeetingModel, MeetingStatus
+from ..models.ai_profile import AIProfile as AIProfileModel
 import uuid as uuid_lib
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/meetings", tags=["meetings"])
 
+meeting_list_serializer = ListSerializer(Meeting)
+
 @router.post("/", response_model=Meeting)
 async def create_meeting(
     meeting: MeetingCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    profile_exists = db.query(AIProfileModel.id).filter(
+        AIProfileModel.id == meeting.ai_profile_id,
+        AIProfileModel.created_by == current_user.id,
+        AIProfileModel.deleted_at.is_(None)
+    ).first()
+    if not profile_exists:
+        raise HTTPException(status_code=404, detail="AI Profile not found")
+    
     try:
         # Check for recent duplicate meetings (within last 5 minutes)
         recent_cutoff = datetime.utcnow() - timedelta(minutes=5)
@@ -44,9 +60,10 @@ async def create_meeting(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create meeting: {str(e)}")
 
-@router.get("/", response_model=List[Meeting])
+@router.get("/", response_model=List[Meeting], dependencies=[Depends(meetings_etag)])
 async def get_my_meetings(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
@@ -60,14 +77,14 @@ async def get_my_meetings(
                 seen_uuids.add(meeting.uuid)
                 unique_meetings.append(meeting)
         
-        return unique_meetings
+        return meeting_list_serializer.response(unique_meetings, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch meetings: {str(e)}")
 
 @router.get("/{meeting_uuid}", response_model=Meeting)
 async def get_meeting(
     meeting_uuid: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
@@ -83,21 +100,18 @@ async def get_meeting(
 async def start_meeting(
     meeting_uuid: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context)
 ):
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
+        # start_meeting leaves an already active meeting untouched
+        updated_meeting = meeting_service.start_meeting(db, meeting.id)
+        if meeting.status == MeetingStatus.active:
+            return {"message": "Meeting already started", "meeting": updated_meeting}
         
-        # Check if meeting is already started
-        if meeting.status == "active":
-            return {"message": "Meeting already started", "meeting": meeting}
+        # Load the profile and recent history once for all turns of this meeting
+        meeting.status = MeetingStatus.active
+        meeting_sessions.open(db, meeting)
         
-        updated_meeting = meeting_service.start_meeting(db, meeting.id)
         return {"message": "Meeting started successfully", "meeting": updated_meeting}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start meeting: {str(e)}")
@@ -105,23 +119,19 @@ async def start_meeting(
 @router.put("/{meeting_uuid}/end")
 async def end_meeting(
     meeting_uuid: str,
-    transcript: str = "",
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context)
 ):
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
+        # The transcript is built from chat_history, so in-flight turns must land first
+        await turn_actors.drain(meeting.uuid)
         
-        # Check if meeting is already ended
-        if meeting.status == "completed":
-            return {"message": "Meeting already ended", "meeting": meeting}
+        # end_meeting leaves an already completed meeting untouched
+        updated_meeting = meeting_service.end_meeting(db, meeting.id)
+        meeting_sessions.evict(meeting.uuid)
+        if meeting.status == MeetingStatus.completed:
+            return {"message": "Meeting already ended", "meeting": updated_meeting}
         
-        updated_meeting = meeting_service.end_meeting(db, meeting.id, transcript)
         return {"message": "Meeting ended successfully", "meeting": updated_meeting}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to end meeting: {str(e)}")
@@ -131,16 +141,9 @@ async def update_meeting(
     meeting_uuid: str,
     meeting_update: MeetingUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    meeting: MeetingContext = Depends(get_meeting_context)
 ):
     try:
-        meeting = meeting_service.get_meeting_by_uuid(db, meeting_uuid)
-        if not meeting:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        
-        if meeting.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
         updated_meeting = meeting_service.update_meeting(db, meeting.id, meeting_update)
         return updated_meeting
     except Exception as e:
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+class ProfileTokenRequest(BaseModel):
+    method: str = "POST"
+    path: str
+    ttl_seconds: int = Field(300, gt=0, le=3600)
@@ -60,8 +60,6 @@ class AIProfileUpdate(BaseModel):
     domain_expertise: Optional[str] = None
     gender: Optional[str] = None
     user_notes: Optional[str] = None
-    pdf_content: Optional[str] = None
-    pdf_filename: Optional[str] = None
     
     @validator('gender')
     def normalize_gender(cls, v):
@@ -106,8 +104,11 @@ class AIProfileUpdate(BaseModel):
 class AIProfile(AIProfileBase):
     id: int
     created_by: int
-    pdf_content: Optional[str] = None
     pdf_filename: Optional[str] = None
+    pdf_summary: Optional[str] = None
+    pdf_page_count: Optional[int] = None
+    pdf_char_count: Optional[int] = None
+    pdf_chunk_count: Optional[int] = None
     created_at: datetime
     
     class Config:
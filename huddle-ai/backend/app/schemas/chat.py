@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 class ChatMessageBase(BaseModel):
     message: str
@@ -9,7 +10,7 @@ class ChatMessageCreate(ChatMessageBase):
     meeting_id: int
 
 class ChatMessage(ChatMessageBase):
-    id: int
+    id: Optional[int] = None  # None while the message is still in the write-behind buffer
     meeting_id: int
     created_at: datetime
     
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class KnowledgeDocument(BaseModel):
+    id: int
+    ai_profile_id: int
+    filename: str
+    status: str
+    error: Optional[str] = None
+    page_count: Optional[int] = None
+    char_count: Optional[int] = None
+    chunk_count: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class KnowledgeChunk(BaseModel):
+    document_id: int
+    chunk_index: int
+    page_number: int
+    start_offset: int
+    end_offset: int
+    content: str
+    
+    class Config:
+        from_attributes = True
@@ -1,31 +1,150 @@
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from ..core.database import get_db
-from ..core.security import verify_token
+from ..core.config import settings
+from ..core.database import get_read_db, is_replica_session, SessionLocal
+from ..core.security import decode_token
 from ..models.user import User
 from typing import Optional
+from collections import OrderedDict
+from datetime import datetime
+import hmac
+import threading
+import time
 
 security = HTTPBearer()
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+
+class Principal:
+    """Authenticated user as seen by request handlers, detached from any DB session"""
+    __slots__ = ("id", "email", "name", "is_active", "created_at")
+
+    def __init__(self, id: int, email: str, name: str, is_active: bool, created_at: datetime):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.is_active = is_active
+        self.created_at = created_at
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(user.id, user.email, user.name, user.is_active, user.created_at)
+
+class PrincipalCache:
+    """Bounded LRU of access token -> Principal with a TTL capped at the token's expiry.
+
+    Entries for a user are dropped when the User row changes in this worker;
+    other workers pick the change up within the TTL.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+
+            principal, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float] = None):
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (principal, expires_at)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+
+            while len(self._entries) > self.max_size:
+                oldest_token = next(iter(self._entries))
+                self._remove(oldest_token)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+
+        user_tokens = self._tokens_by_user.get(entry[0].id)
+        if user_tokens is not None:
+            user_tokens.discard(token)
+            if not user_tokens:
+                del self._tokens_by_user[entry[0].id]
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_principal(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: Session = Depends(get_read_db)
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    email = verify_token(credentials.credentials)
-    if email is None:
+
+    token = credentials.credentials
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    payload = decode_token(token)
+    if payload is None:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
+
+    email = payload["sub"]
+    user_id = payload.get("uid")
+
+    user = _load_user(db, email, user_id)
+    if user is None and is_replica_session(db):
+        # A user who just registered may not have replicated yet
+        with SessionLocal() as primary_db:
+            user = _load_user(primary_db, email, user_id)
     if user is None:
         raise credentials_exception
-    
+
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
+
+async def require_admin(admin_key: Optional[str] = Depends(admin_key_header)):
+    # Without a configured key the admin surface does not exist
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not admin_key or not hmac.compare_digest(admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+def _load_user(db: Session, email: str, user_id: Optional[int]) -> Optional[User]:
+    if user_id is None:
+        return db.query(User).filter(User.email == email).first()
+
+    # Tokens carrying "uid" resolve with a primary-key fetch
+    user = db.get(User, user_id)
+    if user is not None and user.email != email:
+        return None
     return user
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -36,4 +155,4 @@ def create_user(db: Session, user_data: dict) -> User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    return db_user
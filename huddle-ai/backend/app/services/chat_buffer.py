@@ -0,0 +1,302 @@
+import asyncio
+import fcntl
+import glob
+import json
+import os
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import DBAPIError, OperationalError
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.chat import ChatHistory
+from ..models.meeting import bump_chat_version
+from .chat_events import chat_events
+
+class ChatWriteBuffer:
+    """Per-worker write-behind buffer for chat_history.
+
+    Messages are appended to a local journal file and kept in memory until a
+    size or time trigger flushes them to MySQL as one multi-row INSERT. Rows
+    MySQL rejects outright go to a dead-letter file instead of blocking the
+    rest; while CHAT_MAX_PENDING messages are waiting, callers write directly.
+    """
+
+    def __init__(self):
+        self.enabled = settings.CHAT_WRITE_BEHIND
+        self.batch_size = settings.CHAT_FLUSH_BATCH_SIZE
+        self.flush_interval = settings.CHAT_FLUSH_INTERVAL_SECONDS
+        self.journal_dir = settings.CHAT_JOURNAL_DIR
+        # Unique per process start: a restarted container often reuses the pid, and
+        # reopening a dead worker's journal as our own would drop its unflushed entries
+        self.journal_path = os.path.join(self.journal_dir, f"chat-{os.getpid()}-{uuid.uuid4().hex[:8]}.journal")
+        self.dead_letter_path = os.path.join(self.journal_dir, "chat-dead-letter.jsonl")
+        self.max_pending = settings.CHAT_MAX_PENDING
+
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._journal = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if not self.enabled:
+            return
+
+        os.makedirs(self.journal_dir, exist_ok=True)
+
+        # Hold an exclusive lock on our own journal so other workers never replay it
+        self._journal = open(self.journal_path, "a+", encoding="utf-8")
+        fcntl.flock(self._journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._replay_orphaned_journals()
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+        print(f"Chat write-behind enabled (journal: {self.journal_path})")
+
+    async def stop(self):
+        if not self.enabled or self._journal is None:
+            return
+
+        if self._task:
+            self._task.cancel()
+
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+        with self._lock:
+            remaining = len(self._pending)
+            self._journal.close()
+            self._journal = None
+            if remaining == 0:
+                os.remove(self.journal_path)
+        print(f"Chat write-behind stopped ({remaining} messages left in journal)")
+
+    def accepting(self) -> bool:
+        """False when write-behind is off or the backlog is full; callers then insert directly"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            return len(self._pending) < self.max_pending
+
+    def append(
+        self, meeting_id: int, message: str, content_hash: str, is_user: bool, created_at: datetime
+    ) -> ChatHistory:
+        entry = {
+            "meeting_id": meeting_id,
+            "message": message,
+            "content_hash": content_hash,
+            "is_user": is_user,
+            "created_at": created_at.isoformat()
+        }
+
+        with self._lock:
+            # Journal first so an acknowledged message survives a worker crash
+            self._journal.write(json.dumps(entry) + "\n")
+            self._journal.flush()
+            self._pending.append(entry)
+            should_flush = len(self._pending) >= self.batch_size
+
+        if should_flush and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+        return self._to_model(entry)
+
+    def pending_for(self, meeting_id: int) -> List[ChatHistory]:
+        with self._lock:
+            return [self._to_model(entry) for entry in self._pending if entry["meeting_id"] == meeting_id]
+
+    def pending_count(self, meeting_id: int) -> int:
+        with self._lock:
+            return sum(1 for entry in self._pending if entry["meeting_id"] == meeting_id)
+
+    def find_recent(
+        self, meeting_id: int, is_user: bool, content_hash: str, cutoff: datetime
+    ) -> Optional[ChatHistory]:
+        cutoff_iso = cutoff.isoformat()
+        with self._lock:
+            for entry in reversed(self._pending):
+                if (entry["meeting_id"] == meeting_id and entry["is_user"] == is_user
+                        and entry["content_hash"] == content_hash and entry["created_at"] >= cutoff_iso):
+                    return self._to_model(entry)
+        return None
+
+    def flush(self) -> int:
+        """Write all pending messages in one multi-row INSERT. Safe to call from any thread.
+
+        If the batch fails, rows are retried one by one so a single bad row
+        (e.g. its meeting was purged) is dead-lettered instead of blocking the rest.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return 0
+
+            try:
+                self._insert_rows([self._to_row(entry) for entry in batch])
+                done = len(batch)
+            except OperationalError as e:
+                # Database unreachable; everything stays pending
+                print(f"Chat buffer flush failed, will retry: {e}")
+                return 0
+            except Exception as e:
+                print(f"Chat buffer batch insert failed, retrying row by row: {e}")
+                done = self._insert_one_by_one(batch)
+
+            with self._lock:
+                # Entries appended while the INSERT ran stay pending and in the journal
+                del self._pending[:done]
+                self._rewrite_journal()
+
+            return done
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                flushed = await loop.run_in_executor(None, self.flush)
+                if flushed:
+                    print(f"Flushed {flushed} buffered chat messages")
+            except Exception as e:
+                print(f"Chat buffer flush loop error: {e}")
+
+    def _rewrite_journal(self):
+        self._journal.seek(0)
+        self._journal.truncate()
+        for entry in self._pending:
+            self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _replay_orphaned_journals(self):
+        """Insert messages left behind by workers that died before flushing"""
+        for path in glob.glob(os.path.join(self.journal_dir, "chat-*.journal")):
+            if path == self.journal_path:
+                continue
+
+            with open(path, "r+", encoding="utf-8") as journal:
+                try:
+                    fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # Owned by a live worker
+
+                entries = [json.loads(line) for line in journal if line.strip()]
+                if entries:
+                    try:
+                        self._insert_missing(entries)
+                    except OperationalError as e:
+                        # Database unreachable; keep the journal for the next start
+                        print(f"Could not replay {path}, keeping it: {e}")
+                        continue
+                    print(f"Replayed {len(entries)} chat messages from {path}")
+
+            os.remove(path)
+
+    def _insert_missing(self, entries: List[dict]):
+        # A crash between commit and journal rewrite leaves already-flushed
+        # entries behind; idx_chat_dedup makes the existence check cheap
+        db = SessionLocal()
+        try:
+            missing = []
+            for entry in entries:
+                row = self._to_row(entry)
+                # created_at is a TIMESTAMP with whole seconds; older journals kept
+                # microseconds, which MySQL rounded up or down on insert
+                exists = db.query(ChatHistory.id).filter(
+                    ChatHistory.meeting_id == row["meeting_id"],
+                    ChatHistory.is_user == row["is_user"],
+                    ChatHistory.content_hash == row["content_hash"],
+                    ChatHistory.created_at >= row["created_at"],
+                    ChatHistory.created_at <= row["created_at"] + timedelta(seconds=1)
+                ).first()
+                if not exists:
+                    missing.append(entry)
+        finally:
+            db.close()
+
+        if not missing:
+            return
+        try:
+            self._insert_rows([self._to_row(entry) for entry in missing])
+        except OperationalError:
+            raise
+        except Exception as e:
+            print(f"Chat journal batch replay failed, retrying row by row: {e}")
+            if self._insert_one_by_one(missing) < len(missing):
+                raise OperationalError("replay row by row", None, e)
+
+    def _insert_rows(self, rows: List[dict]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(ChatHistory), rows)
+            for meeting_id, inserted in Counter(row["meeting_id"] for row in rows).items():
+                bump_chat_version(db, meeting_id, inserted)
+            saved = self._load_inserted(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        # Subscribers see buffered messages only now, with ids a since_id cursor can move past
+        for chat_message in saved:
+            chat_events.publish(chat_message)
+
+    def _load_inserted(self, db, rows: List[dict]) -> List[ChatHistory]:
+        # A multi-row INSERT does not report its ids; the dedup window makes these keys unique
+        keys = [(row["meeting_id"], row["is_user"], row["content_hash"], row["created_at"]) for row in rows]
+        found = db.query(
+            ChatHistory.id, ChatHistory.meeting_id, ChatHistory.message, ChatHistory.is_user, ChatHistory.created_at
+        ).filter(
+            tuple_(ChatHistory.meeting_id, ChatHistory.is_user, ChatHistory.content_hash, ChatHistory.created_at).in_(keys)
+        ).order_by(ChatHistory.id).all()
+        return [
+            ChatHistory(id=row.id, meeting_id=row.meeting_id, message=row.message,
+                        is_user=row.is_user, created_at=row.created_at)
+            for row in found
+        ]
+
+    def _insert_one_by_one(self, entries: List[dict]) -> int:
+        """Insert entries in order; returns how many leading entries are settled (saved or dead-lettered).
+
+        Stops at the first connection error so the rest are retried on the next flush.
+        """
+        for index, entry in enumerate(entries):
+            try:
+                self._insert_rows([self._to_row(entry)])
+            except OperationalError as e:
+                print(f"Chat buffer flush failed, will retry: {e}")
+                return index
+            except DBAPIError as e:
+                # Rejected by MySQL itself (FK to a purged meeting, bad data): retrying cannot help
+                self._dead_letter(entry, e)
+        return len(entries)
+
+    def _dead_letter(self, entry: dict, error: Exception):
+        print(f"Dropping chat message for meeting {entry['meeting_id']} to {self.dead_letter_path}: {error}")
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**entry, "error": str(error)[:500]}) + "\n")
+
+    def _to_row(self, entry: dict) -> dict:
+        # Whole seconds, matching the TIMESTAMP column, so replay can find the row again
+        created_at = datetime.fromisoformat(entry["created_at"]).replace(microsecond=0)
+        return {**entry, "created_at": created_at}
+
+    def _to_model(self, entry: dict) -> ChatHistory:
+        # Buffered messages have no id until they are flushed
+        return ChatHistory(id=None, **self._to_row(entry))
+
+chat_write_buffer = ChatWriteBuffer()
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from typing import Dict, Optional, Set
+from ..models.chat import ChatHistory
+
+# Slow subscribers drop events beyond this and catch up with since_id on reconnect
+SUBSCRIBER_QUEUE_SIZE = 256
+
+class ChatEventBus:
+    """In-process pub/sub of newly saved chat messages, keyed by meeting id.
+
+    Publishing is thread-safe: writes made from worker threads are handed to
+    the event loop with call_soon_threadsafe. Only messages written by this
+    worker are seen; subscribers backfill from the database on connect.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, meeting_id: int) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(meeting_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, meeting_id: int, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(meeting_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[meeting_id]
+
+    def publish(self, message: ChatHistory):
+        with self._lock:
+            queues = list(self._subscribers.get(message.meeting_id, ()))
+        if not queues or self._loop is None:
+            return
+
+        event = {
+            "id": message.id,
+            "meeting_id": message.meeting_id,
+            "message": message.message,
+            "is_user": message.is_user,
+            "created_at": message.created_at.isoformat() if message.created_at else None
+        }
+        self._loop.call_soon_threadsafe(self._deliver, queues, event)
+
+    def _deliver(self, queues, event: dict):
+        for queue in queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                print(f"Chat event dropped for a slow subscriber of meeting {event['meeting_id']}")
+
+chat_events = ChatEventBus()
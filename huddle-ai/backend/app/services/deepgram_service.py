@@ -1,7 +1,7 @@
 import asyncio
 import aiohttp
 from ..core.config import settings
-from typing import Optional
+from typing import Dict, Optional
 import logging
 import sys
 
@@ -13,6 +13,62 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 logger.addHandler(handler)
 
+class AudioFormat:
+    """A Deepgram TTS encoding/container and the response headers that go with it"""
+
+    def __init__(self, name: str, params: Dict[str, str], media_type: str, extension: str):
+        self.name = name
+        self.params = params
+        self.media_type = media_type
+        self.extension = extension
+
+# Roughly 16 kbit/s Opus and 48 kbit/s MP3 against 384 kbit/s for 24 kHz linear16 WAV
+AUDIO_FORMATS = {
+    "opus": AudioFormat("opus", {"encoding": "opus", "container": "ogg"}, "audio/ogg", "ogg"),
+    "mp3": AudioFormat("mp3", {"encoding": "mp3"}, "audio/mpeg", "mp3"),
+    "linear16": AudioFormat(
+        "linear16", {"encoding": "linear16", "container": "wav", "sample_rate": "24000"}, "audio/wav", "wav"
+    ),
+}
+
+ACCEPT_MEDIA_TYPES = {
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/wav": "linear16",
+    "audio/wave": "linear16",
+    "audio/x-wav": "linear16",
+}
+
+def negotiate_audio_format(accept: Optional[str]) -> AudioFormat:
+    """Pick the TTS format from an Accept header by q-value; wildcards get the configured default"""
+    default = AUDIO_FORMATS.get(settings.TTS_DEFAULT_AUDIO_FORMAT, AUDIO_FORMATS["mp3"])
+    best, best_quality, best_is_wildcard = None, 0.0, False
+    for item in (accept or "").split(","):
+        parts = [part.strip() for part in item.split(";")]
+        media_type = parts[0].lower()
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+
+        if media_type in ACCEPT_MEDIA_TYPES:
+            candidate, is_wildcard = AUDIO_FORMATS[ACCEPT_MEDIA_TYPES[media_type]], False
+        elif media_type in ("audio/*", "*/*"):
+            candidate, is_wildcard = default, True
+        else:
+            continue
+
+        # Explicit types win ties against wildcards; the first explicit type wins among equals
+        if quality > best_quality or (quality == best_quality and best_is_wildcard and not is_wildcard):
+            best, best_quality, best_is_wildcard = candidate, quality, is_wildcard
+
+    return best or default
+
 class DeepgramService:
     def __init__(self):
         self.api_key = settings.DEEPGRAM_API_KEY
@@ -204,8 +260,8 @@ class DeepgramService:
             logger.exception(f"Exception during transcription: {e}")
             return ""
             
-    async def text_to_speech(self, text: str, gender) -> Optional[bytes]:
-        """Convert text to speech using Deepgram TTS"""
+    async def text_to_speech(self, text: str, gender, audio_format: Optional[AudioFormat] = None) -> Optional[bytes]:
+        """Convert text to speech using Deepgram TTS in the requested encoding"""
         try:
             if not text or not text.strip():
                 logger.warning("Empty text provided for TTS")
@@ -238,6 +294,8 @@ class DeepgramService:
             async with aiohttp.ClientSession(timeout=timeout) as session:
                 async def _post(model_name):
                     params = {"model": model_name}
+                    if audio_format is not None:
+                        params.update(audio_format.params)
                     async with session.post(url, headers=headers, json=payload, params=params) as response:
                         if response.status == 200:
                             audio_data = await response.read()
@@ -280,4 +338,33 @@ class DeepgramService:
             "female_voices": ["aura-luna-en", "aura-stella-en", "aura-athena-en", "aura-hera-en"]
         }
 
-deepgram_service = DeepgramService()
\ No newline at end of file
+# Rough encoded size of one second of speech per format, for sizing fake TTS output
+FAKE_BYTES_PER_SECOND = {"opus": 2000, "mp3": 6000, "linear16": 48000}
+FAKE_TRANSCRIPTS = [
+    "I keep getting pulled into meetings and my own work slips.",
+    "How should I give feedback to a senior engineer who misses deadlines?",
+    "My team doesn't speak up in retros. What can I try?",
+    "I want to delegate more but I'm worried about quality.",
+]
+
+class FakeDeepgramService(DeepgramService):
+    """Offline stand-in used when FAKE_PROVIDERS is set.
+
+    Each call awaits FAKE_SPEECH_LATENCY_SECONDS like a network round trip.
+    TTS returns silence sized like real audio of the requested format.
+    """
+
+    async def transcribe_audio(self, audio_data: bytes) -> str:
+        await asyncio.sleep(settings.FAKE_SPEECH_LATENCY_SECONDS)
+        return FAKE_TRANSCRIPTS[len(audio_data) % len(FAKE_TRANSCRIPTS)]
+
+    async def text_to_speech(self, text: str, gender, audio_format: Optional[AudioFormat] = None) -> Optional[bytes]:
+        if not text or not text.strip():
+            return None
+        await asyncio.sleep(settings.FAKE_SPEECH_LATENCY_SECONDS)
+        # About 15 characters of speech per second
+        seconds = max(len(text) / 15, 1)
+        name = audio_format.name if audio_format is not None else "linear16"
+        return bytes(int(seconds * FAKE_BYTES_PER_SECOND[name]))
+
+deepgram_service = FakeDeepgramService() if settings.FAKE_PROVIDERS else DeepgramService()
\ No newline at end of file
@@ -0,0 +1,77 @@
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..core.database import get_read_db
+from ..models.ai_profile import AIProfile
+from ..models.chat import ChatHistory
+from ..models.meeting import Meeting
+from .auth import get_current_user, Principal
+from .chat_buffer import chat_write_buffer
+from .meeting_context import MeetingContext, get_meeting_context_for_read
+import hashlib
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against every entity tag in an If-None-Match header"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def check_not_modified(request: Request, response: Response, *version_parts):
+    """Set the ETag for this GET and answer 304 before any rows are loaded if the client is current"""
+    etag = make_etag(request.url.path, request.url.query, *version_parts)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+async def meetings_etag(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    # Count and maxima come from idx_meetings_owner_updated
+    count, max_id, max_updated = db.query(
+        func.count(Meeting.id), func.max(Meeting.id), func.max(Meeting.updated_at)
+    ).join(AIProfile, AIProfile.id == Meeting.ai_profile_id)\
+        .filter(Meeting.created_by == current_user.id, AIProfile.deleted_at.is_(None))\
+        .one()
+    check_not_modified(request, response, current_user.id, count, max_id, max_updated)
+
+async def ai_profiles_etag(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    # Count and maxima come from idx_ai_profiles_owner_updated
+    count, max_id, max_updated = db.query(
+        func.count(AIProfile.id), func.max(AIProfile.id), func.max(AIProfile.updated_at)
+    ).filter(AIProfile.created_by == current_user.id, AIProfile.deleted_at.is_(None))\
+        .one()
+    check_not_modified(request, response, current_user.id, count, max_id, max_updated)
+
+async def chat_history_etag(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    meeting: MeetingContext = Depends(get_meeting_context_for_read)
+):
+    # Chat rows are append-only, so count and max id from idx_meeting_id are a full version
+    count, max_id = db.query(func.count(ChatHistory.id), func.max(ChatHistory.id))\
+        .filter(ChatHistory.meeting_id == meeting.id)\
+        .one()
+    pending = chat_write_buffer.pending_count(meeting.id) if chat_write_buffer.enabled else 0
+    check_not_modified(request, response, meeting.created_by, count, max_id, pending)
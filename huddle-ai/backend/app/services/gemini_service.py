@@ -259,6 +259,7 @@ from together import Together
 from ..core.config import settings
 from typing import List, Optional
 import logging
+import time
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -297,7 +298,8 @@ class GeminiService:
         coach_description: str,
         domain_expertise: str,
         pdf_content: Optional[str] = None,
-        chat_history: Optional[List[dict]] = None
+        chat_history: Optional[List[dict]] = None,
+        prompt_preamble: Optional[str] = None
     ) -> str:
         try:
             if not self.client or not self.model:
@@ -309,7 +311,7 @@ class GeminiService:
             
             prompt = self._build_prompt(
                 user_message, coach_role, coach_description, 
-                domain_expertise, pdf_content, chat_history
+                domain_expertise, pdf_content, chat_history, prompt_preamble
             )
             
             logger.info(f"Generating response for user message: '{user_message[:100]}...'")
@@ -406,15 +408,14 @@ class GeminiService:
             logger.error(f"Error generating summary: {e}")
             return self._get_default_summary()
     
-    def _build_prompt(
+    def build_prompt_preamble(
         self,
-        user_message: str,
         coach_role: str,
         coach_description: str,
         domain_expertise: str,
-        pdf_content: Optional[str] = None,
-        chat_history: Optional[List[dict]] = None
+        pdf_content: Optional[str] = None
     ) -> str:
+        """Coach persona and knowledge base part of the prompt; constant for a meeting"""
         prompt = f"""You are an AI coach named {coach_role} with expertise in {domain_expertise}.
 
 Your personality and coaching style: {coach_description}
@@ -439,6 +440,24 @@ Use this knowledge to enhance your coaching when relevant.
 
 """
         
+        return prompt
+    
+    def _build_prompt(
+        self,
+        user_message: str,
+        coach_role: str,
+        coach_description: str,
+        domain_expertise: str,
+        pdf_content: Optional[str] = None,
+        chat_history: Optional[List[dict]] = None,
+        prompt_preamble: Optional[str] = None
+    ) -> str:
+        if prompt_preamble is None:
+            prompt_preamble = self.build_prompt_preamble(
+                coach_role, coach_description, domain_expertise, pdf_content
+            )
+        prompt = prompt_preamble
+        
         if chat_history and len(chat_history) > 0:
             prompt += "RECENT CONVERSATION CONTEXT:\n"
             for msg in chat_history[-5:]:  # Only last 5 messages for context
@@ -520,4 +539,47 @@ Please respond as the AI coach, providing helpful guidance while staying true to
             "action_items": "• Continue working on discussed strategies\n• Apply insights from the session\n• Schedule follow-up as needed"
         }
 
-gemini_service = GeminiService()
\ No newline at end of file
+class FakeGeminiService(GeminiService):
+    """Offline stand-in used when FAKE_PROVIDERS is set.
+
+    Builds the real prompt, then sleeps FAKE_LLM_LATENCY_SECONDS in the calling
+    thread the way a blocking Together call would, and returns canned text.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.model = "fake"
+        logger.info("Using fake LLM provider")
+
+    def generate_response(
+        self,
+        user_message: str,
+        coach_role: str,
+        coach_description: str,
+        domain_expertise: str,
+        pdf_content: Optional[str] = None,
+        chat_history: Optional[List[dict]] = None,
+        prompt_preamble: Optional[str] = None
+    ) -> str:
+        if not user_message or not user_message.strip():
+            return "I didn't catch that. Could you please repeat your question?"
+        
+        prompt = self._build_prompt(
+            user_message, coach_role, coach_description,
+            domain_expertise, pdf_content, chat_history, prompt_preamble
+        )
+        time.sleep(settings.FAKE_LLM_LATENCY_SECONDS)
+        return (
+            f"As your {coach_role}, I hear you on \"{user_message.strip()[:80]}\". "
+            f"Let's break it into one concrete step for this week. ({len(prompt)} prompt chars)"
+        )
+
+    def generate_summary(self, transcript: str) -> dict:
+        time.sleep(settings.FAKE_LLM_LATENCY_SECONDS)
+        return self._parse_summary_response(
+            "SUMMARY:\nA coaching session was held.\n\n"
+            f"KEY POINTS:\n- {len(transcript.splitlines())} lines of conversation\n\n"
+            "ACTION ITEMS:\n- Follow up next session"
+        )
+
+gemini_service = FakeGeminiService() if settings.FAKE_PROVIDERS else GeminiService()
\ No newline at end of file
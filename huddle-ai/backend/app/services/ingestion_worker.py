@@ -0,0 +1,109 @@
+import asyncio
+from typing import List, Optional, Set
+from ..core.config import settings
+from .pdf_service import pdf_service
+
+class IngestionQueueFull(Exception):
+    pass
+
+class IngestionWorkerPool:
+    """Bounded queue of uploaded documents drained by a fixed number of asyncio workers.
+
+    Extraction itself runs in pdf_service's process pool; the workers only cap
+    how many documents are in flight per API worker. The queue lives in memory,
+    so a recovery task re-queues documents that a restarted or crashed worker
+    left pending, and clears out upload files nobody will read. Each pass first
+    refreshes updated_at on the documents this worker holds, so a long backlog
+    here never looks abandoned to any worker.
+    """
+
+    def __init__(self, workers: int, queue_size: int, stale_seconds: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.stale_seconds = stale_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._recovery_task: Optional[asyncio.Task] = None
+        # Documents queued or being ingested by this process
+        self._held: Set[int] = set()
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(max(self.workers, 1))]
+        self._recovery_task = asyncio.create_task(self._recover_loop())
+        print(f"Knowledge ingestion started with {len(self._tasks)} workers")
+
+    async def stop(self):
+        tasks = self._tasks + ([self._recovery_task] if self._recovery_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._recovery_task = None
+
+    def submit(self, document_id: int, temp_path: str, sha256: str, size: int):
+        if self._queue is None:
+            raise RuntimeError("Ingestion workers are not running")
+        try:
+            self._queue.put_nowait((document_id, temp_path, sha256, size))
+        except asyncio.QueueFull:
+            raise IngestionQueueFull()
+        self._held.add(document_id)
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.queue_size
+        }
+
+    async def _recover_loop(self):
+        while True:
+            try:
+                await self._recover()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Ingestion recovery error: {e}")
+            # Often enough that held documents are refreshed well before they go stale
+            await asyncio.sleep(self.stale_seconds / 3)
+
+    async def _recover(self):
+        held = set(self._held)
+        if held:
+            await asyncio.to_thread(pdf_service.touch_documents, held)
+
+        free_slots = self.queue_size - self._queue.qsize()
+        if free_slots > 0:
+            claimed = await asyncio.to_thread(
+                pdf_service.claim_stale_documents, self.stale_seconds, free_slots, held
+            )
+            for document_id, temp_path in claimed:
+                sha256, size = await asyncio.to_thread(pdf_service.hash_file, temp_path)
+                try:
+                    self.submit(document_id, temp_path, sha256, size)
+                except IngestionQueueFull:
+                    # Still pending; claimed again once it goes stale
+                    break
+                print(f"Re-queued knowledge document {document_id} after a restart")
+
+        removed = await asyncio.to_thread(pdf_service.remove_orphaned_uploads, self.stale_seconds)
+        if removed:
+            print(f"Removed {removed} orphaned upload files")
+
+    async def _work(self):
+        while True:
+            document_id, temp_path, sha256, size = await self._queue.get()
+            try:
+                await pdf_service.ingest_document(document_id, temp_path, sha256, size)
+            except Exception as e:
+                print(f"Ingestion worker error for document {document_id}: {e}")
+            finally:
+                self._held.discard(document_id)
+                self._queue.task_done()
+
+ingestion_workers = IngestionWorkerPool(
+    settings.KNOWLEDGE_INGEST_WORKERS,
+    settings.KNOWLEDGE_INGEST_QUEUE_SIZE,
+    settings.KNOWLEDGE_INGEST_STALE_SECONDS
+)
@@ -0,0 +1,114 @@
+from sqlalchemy.orm import Session
+from typing import List
+from ..models.ai_profile import AIProfile
+from ..models.knowledge import KnowledgeChunk, KnowledgeDocument
+
+# Chunks are cut at whitespace near this size, never across a page boundary
+CHUNK_CHARS = 2000
+CHUNK_BREAK_WINDOW = 200
+# The prompt builder only ever uses the first 1500 characters of the PDF text
+SUMMARY_CHARS = 1500
+
+class KnowledgeService:
+    def split_pages(self, pages: List[str]) -> List[dict]:
+        """Split extracted pages into chunks with offsets into "".join(pages)"""
+        chunks = []
+        page_start = 0
+        for page_number, page_text in enumerate(pages, start=1):
+            position = 0
+            while position < len(page_text):
+                end = min(position + CHUNK_CHARS, len(page_text))
+                if end < len(page_text):
+                    split_at = page_text.rfind(" ", end - CHUNK_BREAK_WINDOW, end)
+                    if split_at > position:
+                        end = split_at + 1
+
+                content = page_text[position:end]
+                if content.strip():
+                    chunks.append({
+                        "chunk_index": len(chunks),
+                        "page_number": page_number,
+                        "start_offset": page_start + position,
+                        "end_offset": page_start + end,
+                        "content": content
+                    })
+                position = end
+            page_start += len(page_text)
+        return chunks
+
+    def summarize(self, text: str) -> str:
+        return text.strip()[:SUMMARY_CHARS]
+
+    def store_chunks(self, db: Session, blob_sha256: str, pages: List[str]) -> int:
+        chunks = self.split_pages(pages)
+        if chunks:
+            db.bulk_insert_mappings(KnowledgeChunk, [
+                {"blob_sha256": blob_sha256, **chunk} for chunk in chunks
+            ])
+        return len(chunks)
+
+    def delete_chunks(self, db: Session, blob_sha256: str):
+        db.query(KnowledgeChunk)\
+            .filter(KnowledgeChunk.blob_sha256 == blob_sha256)\
+            .delete(synchronize_session=False)
+
+    def get_profile_chunks(self, db: Session, ai_profile_id: int, offset: int = 0, limit: int = 20):
+        """Chunks of the profile's ready documents, in upload order"""
+        return db.query(
+            KnowledgeDocument.id.label("document_id"),
+            KnowledgeChunk.chunk_index,
+            KnowledgeChunk.page_number,
+            KnowledgeChunk.start_offset,
+            KnowledgeChunk.end_offset,
+            KnowledgeChunk.content
+        ).join(KnowledgeChunk, KnowledgeChunk.blob_sha256 == KnowledgeDocument.blob_sha256)\
+            .filter(KnowledgeDocument.ai_profile_id == ai_profile_id, KnowledgeDocument.status == "ready")\
+            .order_by(KnowledgeDocument.id, KnowledgeChunk.chunk_index)\
+            .offset(offset)\
+            .limit(limit)\
+            .all()
+
+    def refresh_profile_stats(self, db: Session, ai_profile_id: int):
+        """Recompute the profile's summary and counts from its ready documents.
+
+        Reads one row per document; chunks of other documents are never touched.
+        The profile row lock serializes workers finishing documents of the same
+        profile, and the shared-lock read sees their latest commits rather than
+        this transaction's snapshot, so the last writer includes every document.
+        """
+        db.query(AIProfile.id).filter(AIProfile.id == ai_profile_id).with_for_update().first()
+        documents = db.query(
+            KnowledgeDocument.filename,
+            KnowledgeDocument.summary,
+            KnowledgeDocument.page_count,
+            KnowledgeDocument.char_count,
+            KnowledgeDocument.chunk_count
+        ).filter(KnowledgeDocument.ai_profile_id == ai_profile_id, KnowledgeDocument.status == "ready")\
+            .order_by(KnowledgeDocument.id)\
+            .with_for_update(read=True)\
+            .all()
+
+        if documents:
+            summary = "\n\n".join(doc.summary for doc in documents if doc.summary)[:SUMMARY_CHARS]
+            values = {
+                "pdf_filename": documents[-1].filename,
+                "pdf_summary": summary,
+                "pdf_page_count": sum(doc.page_count or 0 for doc in documents),
+                "pdf_char_count": sum(doc.char_count or 0 for doc in documents),
+                "pdf_chunk_count": sum(doc.chunk_count or 0 for doc in documents)
+            }
+        else:
+            # Legacy text is one of the documents after migrate_knowledge_documents,
+            # so it goes with the last of them instead of resurfacing as the fallback
+            values = {
+                "pdf_content": None,
+                "pdf_filename": None,
+                "pdf_summary": None,
+                "pdf_page_count": None,
+                "pdf_char_count": None,
+                "pdf_chunk_count": None
+            }
+
+        db.query(AIProfile).filter(AIProfile.id == ai_profile_id).update(values, synchronize_session=False)
+
+knowledge_service = KnowledgeService()
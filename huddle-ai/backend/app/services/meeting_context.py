@@ -0,0 +1,73 @@
+from fastapi import Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..core.database import get_db, get_read_db
+from ..models.meeting import Meeting
+from ..models.ai_profile import AIProfile
+from .auth import get_current_user, Principal
+from .knowledge_service import SUMMARY_CHARS
+from .session_cache import meeting_sessions
+from typing import Optional
+
+
+class MeetingContext:
+    """The meeting and AI profile columns a chat or voice turn needs"""
+    __slots__ = (
+        "id", "uuid", "status", "created_by", "ai_profile_id",
+        "coach_name", "coach_role", "coach_description", "domain_expertise", "gender", "pdf_excerpt"
+    )
+
+    def __init__(self, row):
+        for field in self.__slots__:
+            setattr(self, field, getattr(row, field))
+
+def load_meeting_context(db: Session, meeting_uuid: str, user_id: int) -> Optional[MeetingContext]:
+    """Meeting joined to its AI profile in one query, filtered by UUID and owner"""
+    row = db.query(
+        Meeting.id,
+        Meeting.uuid,
+        Meeting.status,
+        Meeting.created_by,
+        Meeting.ai_profile_id,
+        AIProfile.coach_name,
+        AIProfile.coach_role,
+        AIProfile.coach_description,
+        AIProfile.domain_expertise,
+        AIProfile.gender,
+        # Legacy profiles without a summary fall back to the head of their full text
+        func.coalesce(
+            AIProfile.pdf_summary,
+            func.substr(AIProfile.pdf_content, 1, SUMMARY_CHARS)
+        ).label("pdf_excerpt")
+    ).join(AIProfile, AIProfile.id == Meeting.ai_profile_id)\
+        .filter(Meeting.uuid == meeting_uuid, Meeting.created_by == user_id, AIProfile.deleted_at.is_(None))\
+        .first()
+
+    return MeetingContext(row) if row else None
+
+def resolve_meeting_context(db: Session, meeting_uuid: str, user_id: int) -> Optional[MeetingContext]:
+    # Live meetings are answered from the session cache after one version check
+    session = meeting_sessions.get_current(db, meeting_uuid)
+    if session is not None and session.context.created_by == user_id:
+        return session.context
+    return load_meeting_context(db, meeting_uuid, user_id)
+
+async def get_meeting_context(
+    meeting_uuid: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+) -> MeetingContext:
+    context = resolve_meeting_context(db, meeting_uuid, current_user.id)
+    if context is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return context
+
+async def get_meeting_context_for_read(
+    meeting_uuid: str,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+) -> MeetingContext:
+    context = resolve_meeting_context(db, meeting_uuid, current_user.id)
+    if context is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return context
@@ -1,15 +1,16 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import distinct, and_
+from sqlalchemy import distinct, and_, or_, insert
 from sqlalchemy.exc import IntegrityError
-from ..models.meeting import Meeting, MeetingStatus
+from ..models.meeting import Meeting, MeetingStatus, bump_chat_version
 from ..models.ai_profile import AIProfile
-from ..models.chat import ChatHistory
+from ..models.chat import ChatHistory, compute_content_hash
 from ..schemas.meeting import MeetingCreate, MeetingUpdate
 from ..services.gemini_service import gemini_service
-from typing import List, Optional
+from ..services.chat_buffer import chat_write_buffer
+from ..services.chat_events import chat_events
+from typing import List, Optional, Tuple
 import uuid
 from datetime import datetime, timedelta
-import hashlib
 
 class MeetingService:
     def create_meeting(self, db: Session, meeting_data: MeetingCreate, user_id: int) -> Meeting:
@@ -49,8 +50,10 @@ class MeetingService:
     def get_user_meetings(self, db: Session, user_id: int) -> List[Meeting]:
         try:
             # Get meetings with explicit distinct to prevent duplicates
+            # Meetings of a profile awaiting the reaper are hidden
             meetings = db.query(Meeting)\
-                .filter(Meeting.created_by == user_id)\
+                .join(AIProfile, AIProfile.id == Meeting.ai_profile_id)\
+                .filter(Meeting.created_by == user_id, AIProfile.deleted_at.is_(None))\
                 .order_by(Meeting.created_at.desc())\
                 .all()
             
@@ -72,7 +75,10 @@ class MeetingService:
     
     def get_meeting_by_uuid(self, db: Session, meeting_uuid: str) -> Optional[Meeting]:
         try:
-            return db.query(Meeting).filter(Meeting.uuid == meeting_uuid).first()
+            return db.query(Meeting)\
+                .join(AIProfile, AIProfile.id == Meeting.ai_profile_id)\
+                .filter(Meeting.uuid == meeting_uuid, AIProfile.deleted_at.is_(None))\
+                .first()
         except Exception as e:
             print(f"Failed to get meeting by UUID: {e}")
             return None
@@ -92,16 +98,17 @@ class MeetingService:
             print(f"Failed to start meeting: {e}")
             raise
     
-    def end_meeting(self, db: Session, meeting_id: int, transcript: str) -> Meeting:
+    def end_meeting(self, db: Session, meeting_id: int) -> Meeting:
         try:
             meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
             if meeting and meeting.status != MeetingStatus.completed:
+                transcript = self.build_transcript(db, meeting_id)
                 meeting.status = MeetingStatus.completed
                 meeting.ended_at = datetime.utcnow()
                 meeting.transcript = transcript
                 
                 # Generate summary only if transcript exists and isn't empty
-                if transcript and transcript.strip():
+                if transcript:
                     try:
                         ai_profile = db.query(AIProfile).filter(AIProfile.id == meeting.ai_profile_id).first()
                         if ai_profile:
@@ -122,6 +129,22 @@ class MeetingService:
             print(f"Failed to end meeting: {e}")
             raise
     
+    def build_transcript(self, db: Session, meeting_id: int) -> str:
+        """Assemble the transcript from chat_history in order, streaming rows in batches"""
+        rows = db.query(ChatHistory.message, ChatHistory.is_user)\
+            .filter(ChatHistory.meeting_id == meeting_id)\
+            .order_by(ChatHistory.id)\
+            .yield_per(500)
+        
+        lines = [f"{'User' if row.is_user else 'AI'}: {row.message}" for row in rows]
+        if chat_write_buffer.enabled:
+            lines += [
+                f"{'User' if msg.is_user else 'AI'}: {msg.message}"
+                for msg in chat_write_buffer.pending_for(meeting_id)
+            ]
+        
+        return "\n".join(lines)
+    
     def update_meeting(self, db: Session, meeting_id: int, meeting_data: MeetingUpdate) -> Meeting:
         try:
             meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
@@ -145,38 +168,50 @@ class MeetingService:
             if not cleaned_message:
                 raise ValueError("Message cannot be empty")
             
-            # Create a hash for duplicate detection
-            message_hash = hashlib.md5(
-                f"{cleaned_message}_{is_user}_{meeting_id}".encode()
-            ).hexdigest()
+            # Hash is computed once here and stored, so reads never need to dedup
+            content_hash = compute_content_hash(cleaned_message)
             
-            # Check for recent duplicates (within last 10 seconds)
+            # Check for recent duplicates (within last 10 seconds) using idx_chat_dedup
             recent_cutoff = datetime.utcnow() - timedelta(seconds=10)
             existing_message = db.query(ChatHistory).filter(
                 and_(
                     ChatHistory.meeting_id == meeting_id,
-                    ChatHistory.message == cleaned_message,
                     ChatHistory.is_user == is_user,
+                    ChatHistory.content_hash == content_hash,
                     ChatHistory.created_at >= recent_cutoff
                 )
             ).first()
             
+            if not existing_message and chat_write_buffer.enabled:
+                existing_message = chat_write_buffer.find_recent(meeting_id, is_user, content_hash, recent_cutoff)
+            
             if existing_message:
                 print(f"Duplicate message detected, returning existing message: {existing_message.id}")
                 return existing_message
             
+            if chat_write_buffer.accepting():
+                # Write-behind: journaled now, inserted with the next batch
+                # Published by the flush, once it has an id
+                return chat_write_buffer.append(
+                    meeting_id, cleaned_message, content_hash, is_user, datetime.utcnow()
+                )
+            
             # Create new message
             chat_message = ChatHistory(
                 meeting_id=meeting_id,
                 message=cleaned_message,
-                is_user=is_user
+                content_hash=content_hash,
+                is_user=is_user,
+                created_at=datetime.utcnow()
             )
             
             db.add(chat_message)
+            bump_chat_version(db, meeting_id, 1)
             db.commit()
             db.refresh(chat_message)
             
             print(f"Chat message added successfully: {chat_message.id}")
+            chat_events.publish(chat_message)
             return chat_message
             
         except Exception as e:
@@ -184,28 +219,125 @@ class MeetingService:
             print(f"Failed to add chat message: {e}")
             raise
     
-    def get_chat_history(self, db: Session, meeting_id: int) -> List[ChatHistory]:
+    def add_chat_turn(
+        self, db: Session, meeting_id: int, user_message: str, ai_message: str
+    ) -> Tuple[ChatHistory, ChatHistory, int]:
+        """Persist the user message and the AI reply of one turn in a single transaction.
+
+        Also returns how many of the two were new (inserted or buffered) rather than duplicates.
+        """
         try:
-            messages = db.query(ChatHistory)\
-                .filter(ChatHistory.meeting_id == meeting_id)\
-                .order_by(ChatHistory.created_at)\
-                .all()
+            user_text = user_message.strip()
+            ai_text = ai_message.strip()
+            if not user_text or not ai_text:
+                raise ValueError("Message cannot be empty")
+            
+            now = datetime.utcnow()
+            turn = [(user_text, True), (ai_text, False)]
+            hashes = {is_user: compute_content_hash(text) for text, is_user in turn}
             
-            # Remove duplicates based on content and user type
-            seen_combinations = set()
-            unique_messages = []
+            # One dedup lookup for both halves of the turn
+            recent_cutoff = now - timedelta(seconds=10)
+            duplicates = db.query(ChatHistory.id, ChatHistory.is_user, ChatHistory.created_at).filter(
+                ChatHistory.meeting_id == meeting_id,
+                ChatHistory.created_at >= recent_cutoff,
+                or_(
+                    and_(ChatHistory.is_user == True, ChatHistory.content_hash == hashes[True]),
+                    and_(ChatHistory.is_user == False, ChatHistory.content_hash == hashes[False])
+                )
+            ).all()
+            existing = {row.is_user: row for row in duplicates}
             
-            for message in messages:
-                # Create unique identifier
-                message_key = f"{message.message}_{message.is_user}_{message.meeting_id}"
-                message_hash = hashlib.md5(message_key.encode()).hexdigest()
+            saved = []
+            new_messages = []
+            for text, is_user in turn:
+                if is_user not in existing and chat_write_buffer.enabled:
+                    buffered = chat_write_buffer.find_recent(meeting_id, is_user, hashes[is_user], recent_cutoff)
+                    if buffered:
+                        existing[is_user] = buffered
                 
-                if message_hash not in seen_combinations:
-                    seen_combinations.add(message_hash)
-                    unique_messages.append(message)
+                if is_user in existing:
+                    row_id, created_at = existing[is_user].id, existing[is_user].created_at
+                    print(f"Duplicate message detected, reusing existing message: {row_id}")
+                elif chat_write_buffer.accepting():
+                    buffered = chat_write_buffer.append(meeting_id, text, hashes[is_user], is_user, now)
+                    saved.append(buffered)
+                    new_messages.append(buffered)
+                    continue
+                else:
+                    # created_at is set client-side and the id comes from the insert
+                    # result, so no refresh round trip is needed after commit
+                    created_at = now
+                    result = db.execute(
+                        insert(ChatHistory).values(
+                            meeting_id=meeting_id,
+                            message=text,
+                            content_hash=hashes[is_user],
+                            is_user=is_user,
+                            created_at=created_at
+                        )
+                    )
+                    row_id = result.inserted_primary_key[0]
+                
+                chat_message = ChatHistory(
+                    id=row_id,
+                    meeting_id=meeting_id,
+                    message=text,
+                    content_hash=hashes[is_user],
+                    is_user=is_user,
+                    created_at=created_at
+                )
+                saved.append(chat_message)
+                if is_user not in existing:
+                    new_messages.append(chat_message)
+            
+            # Buffered rows bump the version when they are flushed
+            inserted = sum(1 for chat_message in new_messages if chat_message.id is not None)
+            bump_chat_version(db, meeting_id, inserted)
+            db.commit()
+            # Buffered messages are published by the flush, once they have ids
+            for chat_message in new_messages:
+                if chat_message.id is not None:
+                    chat_events.publish(chat_message)
+            
+            print(f"Chat turn saved: user {saved[0].id}, ai {saved[1].id}")
+            return saved[0], saved[1], len(new_messages)
+            
+        except Exception as e:
+            db.rollback()
+            print(f"Failed to add chat turn: {e}")
+            raise
+    
+    def get_recent_messages(self, db: Session, meeting_id: int, limit: int = 10) -> List[dict]:
+        """Last `limit` messages in chronological order, shaped for the prompt builder"""
+        rows = db.query(ChatHistory.message, ChatHistory.is_user)\
+            .filter(ChatHistory.meeting_id == meeting_id)\
+            .order_by(ChatHistory.id.desc())\
+            .limit(limit)\
+            .all()
+        
+        history = [{"message": row.message, "is_user": row.is_user} for row in reversed(rows)]
+        if chat_write_buffer.enabled:
+            pending = chat_write_buffer.pending_for(meeting_id)
+            history += [{"message": msg.message, "is_user": msg.is_user} for msg in pending]
+        
+        return history[-limit:]
+    
+    def get_chat_history(self, db: Session, meeting_id: int, since_id: Optional[int] = None) -> List[ChatHistory]:
+        try:
+            # Duplicates are rejected on write, so this is a plain range scan on meeting_id
+            query = db.query(ChatHistory).filter(ChatHistory.meeting_id == meeting_id)
+            if since_id is not None:
+                query = query.filter(ChatHistory.id > since_id)
+            messages = query.order_by(ChatHistory.id).all()
+            
+            # Unflushed write-behind entries are newer than anything in the table. They have
+            # no id yet, so a since_id delta leaves them out and returns them once flushed
+            if chat_write_buffer.enabled and since_id is None:
+                messages += chat_write_buffer.pending_for(meeting_id)
             
-            print(f"Retrieved {len(unique_messages)} unique chat messages for meeting {meeting_id}")
-            return unique_messages
+            print(f"Retrieved {len(messages)} chat messages for meeting {meeting_id}")
+            return messages
             
         except Exception as e:
             print(f"Failed to get chat history: {e}")
@@ -1,42 +1,364 @@
 import fitz
 import os
-from typing import Optional
+import asyncio
+import aiofiles
+import uuid
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import UploadFile
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Set, Tuple
 from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.knowledge import KnowledgeDocument
+from ..models.pdf_blob import PDFBlob
+from .knowledge_service import knowledge_service
+from .session_cache import meeting_sessions
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Documents longer than this are split into page ranges extracted in parallel
+PAGES_PER_TASK = 50
+INGEST_ACTIVE_STATUSES = ("pending", "processing")
+
+def _count_pages(file_path: str) -> int:
+    with fitz.open(file_path) as doc:
+        return len(doc)
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """Runs in a worker process"""
+    with fitz.open(file_path) as doc:
+        return [doc.load_page(page_num).get_text() for page_num in range(start, end)]
 
 class PDFService:
     def __init__(self):
         self.upload_dir = settings.UPLOAD_DIR
-        os.makedirs(self.upload_dir, exist_ok=True)
-    
+        self.blob_dir = os.path.join(self.upload_dir, "blobs")
+        self.tmp_dir = os.path.join(self.upload_dir, "tmp")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # One ingestion per hash at a time in this worker, so concurrent uploads extract once;
+        # each entry is [lock, ingestions holding or waiting for it]
+        self._hash_locks: Dict[str, list] = {}
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the service never forks
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=settings.PDF_EXTRACT_WORKERS or None)
+        return self._pool
+
     def extract_text_from_pdf(self, file_path: str) -> Optional[str]:
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text += page.get_text()
-            
-            doc.close()
-            return text.strip()
+            return "".join(_extract_page_range(file_path, 0, _count_pages(file_path))).strip()
+        except Exception as e:
+            print(f"PDF extraction error: {e}")
+            return None
+
+    async def count_pages_async(self, file_path: str) -> int:
+        return await asyncio.get_running_loop().run_in_executor(self.pool, _count_pages, file_path)
+
+    async def extract_pages_async(self, file_path: str, page_count: Optional[int] = None) -> Optional[List[str]]:
+        """Extract per-page text in the process pool, splitting large documents into page ranges"""
+        try:
+            if page_count is None:
+                page_count = await self.count_pages_async(file_path)
+
+            loop = asyncio.get_running_loop()
+            ranges = [
+                (start, min(start + PAGES_PER_TASK, page_count))
+                for start in range(0, page_count, PAGES_PER_TASK)
+            ]
+            parts = await asyncio.gather(*[
+                loop.run_in_executor(self.pool, _extract_page_range, file_path, start, end)
+                for start, end in ranges
+            ])
+
+            return [page for part in parts for page in part]
         except Exception as e:
             print(f"PDF extraction error: {e}")
             return None
-    
-    async def save_and_extract_pdf(self, file_content: bytes, filename: str) -> tuple[str, Optional[str]]:
-        try:
-            file_path = os.path.join(self.upload_dir, filename)
-            
-            with open(file_path, "wb") as f:
-                f.write(file_content)
-            
-            extracted_text = self.extract_text_from_pdf(file_path)
-            
-            return file_path, extracted_text
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blob_dir, sha256[:2], f"{sha256}.pdf")
+
+    async def save_upload(self, upload: UploadFile) -> Tuple[str, str, int]:
+        """Stream the upload to a temp file in chunks, hashing as it goes.
+
+        Returns (temp_path, sha256, size); the client filename never touches the disk path.
+        """
+        temp_path = os.path.join(self.tmp_dir, f"{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        size = 0
+
+        async with aiofiles.open(temp_path, "wb") as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                await f.write(chunk)
+
+        return temp_path, digest.hexdigest(), size
+
+    def document_temp_path(self, document_id: int) -> str:
+        return os.path.join(self.tmp_dir, f"doc-{document_id}.part")
+
+    def assign_upload(self, temp_path: str, document_id: int) -> str:
+        """Rename a saved upload after its document so it can be found again after a restart"""
+        document_path = self.document_temp_path(document_id)
+        os.replace(temp_path, document_path)
+        return document_path
+
+    def hash_file(self, file_path: str) -> Tuple[str, int]:
+        digest = hashlib.sha256()
+        size = 0
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+    def touch_documents(self, document_ids: Set[int]):
+        """Heartbeat for documents this worker still holds, so no one else recovers them"""
+        db = SessionLocal()
+        try:
+            db.query(KnowledgeDocument)\
+                .filter(KnowledgeDocument.id.in_(document_ids), KnowledgeDocument.status.in_(INGEST_ACTIVE_STATUSES))\
+                .update({"updated_at": func.now()}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def claim_stale_documents(self, stale_seconds: int, limit: int, exclude: Set[int]) -> List[Tuple[int, str]]:
+        """Reset documents left pending/processing by a dead worker; returns (id, temp path) to re-queue.
+
+        Documents whose upload file is gone are marked failed instead. Each claim
+        is a conditional update, so only one worker re-queues a given document.
+        """
+        stale = (
+            KnowledgeDocument.status.in_(INGEST_ACTIVE_STATUSES),
+            func.coalesce(KnowledgeDocument.updated_at, KnowledgeDocument.created_at)
+            < func.date_sub(func.now(), text(f"INTERVAL {int(stale_seconds)} SECOND"))
+        )
+        db = SessionLocal()
+        try:
+            # Documents held by this worker are never claimed, however long its queue
+            document_ids = [row.id for row in db.query(KnowledgeDocument.id)
+                            .filter(*stale, KnowledgeDocument.id.notin_(exclude or [0]))
+                            .order_by(KnowledgeDocument.id)
+                            .limit(limit)]
+
+            claimed = []
+            for document_id in document_ids:
+                temp_path = self.document_temp_path(document_id)
+                if os.path.exists(temp_path):
+                    values = {"status": "pending", "error": None, "updated_at": func.now()}
+                else:
+                    values = {"status": "failed", "error": "Upload was lost when the server restarted, please upload it again"}
+                updated = db.query(KnowledgeDocument)\
+                    .filter(KnowledgeDocument.id == document_id, *stale)\
+                    .update(values, synchronize_session=False)
+                db.commit()
+                if updated and values["status"] == "pending":
+                    claimed.append((document_id, temp_path))
+            return claimed
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def remove_orphaned_uploads(self, stale_seconds: int) -> int:
+        """Delete temp files older than stale_seconds that no pending document will read"""
+        cutoff = time.time() - stale_seconds
+        db = SessionLocal()
+        try:
+            keep = {
+                self.document_temp_path(row.id)
+                for row in db.query(KnowledgeDocument.id)
+                .filter(KnowledgeDocument.status.in_(INGEST_ACTIVE_STATUSES))
+            }
+        finally:
+            db.close()
+
+        removed = 0
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            try:
+                if path not in keep and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    async def ingest_document(self, document_id: int, temp_path: str, sha256: str, size: int):
+        """Store the uploaded content for a document, extracting only if the hash is new"""
+        entry = self._hash_locks.setdefault(sha256, [asyncio.Lock(), 0])
+        entry[1] += 1
+        lock = entry[0]
+        try:
+            await asyncio.to_thread(self._set_document_status, document_id, "processing")
+            async with lock:
+                pages = None
+                cached = await asyncio.to_thread(self._load_cached_extraction, sha256)
+                if cached is not None:
+                    page_count, extracted_text = cached
+                else:
+                    page_count = await self.count_pages_async(temp_path)
+                    pages = await self.extract_pages_async(temp_path, page_count)
+                    extracted_text = "".join(pages or [])
+                    if not extracted_text.strip():
+                        raise ValueError("Failed to extract text from PDF")
+
+                ai_profile_id = await asyncio.to_thread(
+                    self._attach_document, document_id, temp_path, sha256, size,
+                    page_count, extracted_text, pages
+                )
+
+            meeting_sessions.invalidate_profile(ai_profile_id)
         except Exception as e:
-            print(f"Save PDF error: {e}")
-            return "", None
-    
+            print(f"PDF ingestion failed for document {document_id}: {e}")
+            await asyncio.to_thread(self._set_document_status, document_id, "failed", str(e))
+        finally:
+            # lock.locked() is False between a release and the next waiter waking up, so count instead
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._hash_locks[sha256]
+            self.delete_pdf(temp_path)
+
+    def _set_document_status(self, document_id: int, status: str, error: Optional[str] = None):
+        db = SessionLocal()
+        try:
+            db.query(KnowledgeDocument)\
+                .filter(KnowledgeDocument.id == document_id, KnowledgeDocument.status != "ready")\
+                .update({"status": status, "error": error}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _load_cached_extraction(self, sha256: str) -> Optional[Tuple[Optional[int], str]]:
+        db = SessionLocal()
+        try:
+            row = db.query(PDFBlob.page_count, PDFBlob.extracted_text, PDFBlob.chunk_count)\
+                .filter(PDFBlob.sha256 == sha256)\
+                .first()
+            # Blobs stored before chunking existed are extracted again to build their chunks
+            if row is None or row.extracted_text is None or row.chunk_count is None:
+                return None
+            return row.page_count, row.extracted_text
+        finally:
+            db.close()
+
+    def _attach_document(
+        self,
+        document_id: int,
+        temp_path: str,
+        sha256: str,
+        size: int,
+        page_count: Optional[int],
+        extracted_text: str,
+        pages: Optional[List[str]]
+    ) -> int:
+        """Reference the blob from the document and mark it ready in one transaction.
+
+        Only this document's chunks are built (and only if its hash is new); the
+        profile's other documents are left alone. Returns the document's profile id.
+        """
+        db = SessionLocal()
+        try:
+            document = db.query(KnowledgeDocument).filter(KnowledgeDocument.id == document_id)\
+                .with_for_update().first()
+            if not document:
+                raise ValueError("Document was deleted before ingestion finished")
+            if document.status == "ready":
+                # Re-queued after a restart while the first run was still going; it holds the reference
+                return document.ai_profile_id
+
+            # Row lock keeps a concurrent release from deleting the blob under us
+            blob = db.query(PDFBlob).filter(PDFBlob.sha256 == sha256).with_for_update().first()
+            if blob is None:
+                blob = PDFBlob(sha256=sha256, size=size, ref_count=0)
+                db.add(blob)
+            if blob.extracted_text is None:
+                blob.extracted_text = extracted_text
+                blob.page_count = page_count
+            if blob.chunk_count is None and pages is not None:
+                knowledge_service.delete_chunks(db, sha256)
+                blob.chunk_count = knowledge_service.store_chunks(db, sha256, pages)
+            blob.ref_count = (blob.ref_count or 0) + 1
+            db.flush()
+
+            # Always put our copy in place (same bytes); a file left by a release that
+            # has not finished yet must not stand in for it
+            blob_path = self.blob_path(sha256)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(temp_path, blob_path)
+
+            document.blob_sha256 = sha256
+            document.status = "ready"
+            document.error = None
+            document.summary = knowledge_service.summarize(extracted_text)
+            document.page_count = blob.page_count
+            document.char_count = len(extracted_text)
+            document.chunk_count = blob.chunk_count
+            db.flush()
+
+            knowledge_service.refresh_profile_stats(db, document.ai_profile_id)
+            db.commit()
+            return document.ai_profile_id
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def delete_document(self, db: Session, document: KnowledgeDocument) -> Optional[str]:
+        """Delete one document and release its blob; returns a file path to delete after commit.
+
+        Chunks go only when no other document shares the content.
+        """
+        blob_sha256 = document.blob_sha256
+        db.delete(document)
+        db.flush()
+        return self.release_blob(db, blob_sha256)
+
+    def release_blob(self, db: Session, sha256: Optional[str]) -> Optional[str]:
+        """Drop one reference; returns the file path to delete after commit if it was the last.
+
+        Call after the referencing document row has been flushed away. The last
+        release moves the file aside while it holds the row lock, so an attach
+        of the same hash after the commit never has its new file deleted.
+        """
+        if not sha256:
+            return None
+
+        blob = db.query(PDFBlob).filter(PDFBlob.sha256 == sha256).with_for_update().first()
+        if blob is None:
+            return None
+
+        blob.ref_count = max((blob.ref_count or 0) - 1, 0)
+        if blob.ref_count == 0:
+            knowledge_service.delete_chunks(db, sha256)
+            db.delete(blob)
+            released_path = os.path.join(self.tmp_dir, f"released-{uuid.uuid4().hex}.pdf")
+            try:
+                os.replace(self.blob_path(sha256), released_path)
+            except FileNotFoundError:
+                return None
+            return released_path
+        return None
+
     def delete_pdf(self, file_path: str):
         try:
             if os.path.exists(file_path):
@@ -44,4 +366,4 @@ class PDFService:
         except Exception as e:
             print(f"Delete PDF error: {e}")
 
-pdf_service = PDFService()
\ No newline at end of file
+pdf_service = PDFService()
@@ -0,0 +1,221 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import or_
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.ai_profile import AIProfile
+from ..models.meeting import Meeting
+from ..models.chat import ChatHistory
+from ..models.knowledge import KnowledgeDocument
+from .pdf_service import pdf_service
+
+class ProfileReaper:
+    """Purges soft-deleted AI profiles in small, throttled transactions.
+
+    Each pass claims one profile with a lease tagged with a fresh token (so
+    only one worker reaps it, and a pass whose lease expired and was taken
+    over stops at its next renewal), then deletes its chat_history rows, meetings and knowledge documents in
+    batches of PROFILE_REAPER_BATCH_SIZE, pausing between batches, before
+    removing the profile row itself.
+    """
+
+    def __init__(self):
+        self.interval = settings.PROFILE_REAPER_INTERVAL_SECONDS
+        self.batch_size = settings.PROFILE_REAPER_BATCH_SIZE
+        self.batch_pause = settings.PROFILE_REAPER_BATCH_PAUSE_SECONDS
+        self.lease_seconds = settings.PROFILE_REAPER_LEASE_SECONDS
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def remaining(self, db, ai_profile_id: int) -> Dict[str, int]:
+        """Rows still to be purged for a soft-deleted profile"""
+        return {
+            "chat_messages": db.query(ChatHistory.id)
+                .join(Meeting, Meeting.id == ChatHistory.meeting_id)
+                .filter(Meeting.ai_profile_id == ai_profile_id)
+                .count(),
+            "meetings": db.query(Meeting.id).filter(Meeting.ai_profile_id == ai_profile_id).count(),
+            "documents": db.query(KnowledgeDocument.id)
+                .filter(KnowledgeDocument.ai_profile_id == ai_profile_id)
+                .count()
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                claim = await asyncio.to_thread(self._claim_next)
+                if claim is None:
+                    await asyncio.sleep(self.interval)
+                    continue
+                await self._reap(*claim)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Profile reaper error: {e}")
+                await asyncio.sleep(self.interval)
+
+    async def _reap(self, ai_profile_id: int, lease_token: str):
+        print(f"Reaping AI profile {ai_profile_id}")
+        deleted = {"chat_messages": 0, "meetings": 0, "documents": 0}
+
+        for kind, step in (
+            ("chat_messages", self._delete_chat_batch),
+            ("meetings", self._delete_meeting_batch),
+            ("documents", self._delete_document_batch),
+        ):
+            while True:
+                # Renew before each batch so a pass that lost its lease deletes nothing more
+                if not await asyncio.to_thread(self._renew_lease, ai_profile_id, lease_token):
+                    print(f"Lost reaper lease on AI profile {ai_profile_id}")
+                    return
+                count = await asyncio.to_thread(step, ai_profile_id)
+                if count == 0:
+                    break
+                deleted[kind] += count
+                print(f"Reaping AI profile {ai_profile_id}: {deleted}")
+                await asyncio.sleep(self.batch_pause)
+
+        if not await asyncio.to_thread(self._delete_profile, ai_profile_id, lease_token):
+            print(f"Lost reaper lease on AI profile {ai_profile_id}")
+            return
+        print(f"AI profile {ai_profile_id} purged: {deleted}")
+
+    def _claim_next(self) -> Optional[Tuple[int, str]]:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            lease_token = uuid.uuid4().hex
+            candidates = db.query(AIProfile.id).filter(
+                AIProfile.deleted_at.isnot(None),
+                or_(AIProfile.deletion_lease_until.is_(None), AIProfile.deletion_lease_until < now)
+            ).order_by(AIProfile.deleted_at).limit(10).all()
+
+            for (ai_profile_id,) in candidates:
+                # Conditional update so two workers never claim the same profile
+                claimed = db.query(AIProfile).filter(
+                    AIProfile.id == ai_profile_id,
+                    or_(AIProfile.deletion_lease_until.is_(None), AIProfile.deletion_lease_until < now)
+                ).update(
+                    {
+                        "deletion_lease_until": now + timedelta(seconds=self.lease_seconds),
+                        "deletion_lease_owner": lease_token
+                    },
+                    synchronize_session=False
+                )
+                db.commit()
+                if claimed:
+                    return ai_profile_id, lease_token
+            return None
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _renew_lease(self, ai_profile_id: int, lease_token: str) -> bool:
+        db = SessionLocal()
+        try:
+            # Fails once another worker has taken over the expired lease
+            renewed = db.query(AIProfile).filter(
+                AIProfile.id == ai_profile_id,
+                AIProfile.deleted_at.isnot(None),
+                AIProfile.deletion_lease_owner == lease_token
+            ).update(
+                {"deletion_lease_until": datetime.utcnow() + timedelta(seconds=self.lease_seconds)},
+                synchronize_session=False
+            )
+            db.commit()
+            return renewed == 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _delete_ids(self, db, model, ids: List[int]) -> int:
+        if not ids:
+            return 0
+        db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        return len(ids)
+
+    def _delete_chat_batch(self, ai_profile_id: int) -> int:
+        db = SessionLocal()
+        try:
+            ids = [row.id for row in db.query(ChatHistory.id)
+                   .join(Meeting, Meeting.id == ChatHistory.meeting_id)
+                   .filter(Meeting.ai_profile_id == ai_profile_id)
+                   .limit(self.batch_size)]
+            return self._delete_ids(db, ChatHistory, ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _delete_meeting_batch(self, ai_profile_id: int) -> int:
+        db = SessionLocal()
+        try:
+            ids = [row.id for row in db.query(Meeting.id)
+                   .filter(Meeting.ai_profile_id == ai_profile_id)
+                   .limit(self.batch_size)]
+            return self._delete_ids(db, Meeting, ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _delete_document_batch(self, ai_profile_id: int) -> int:
+        # Documents release blob references one by one, so use a smaller batch
+        db = SessionLocal()
+        released_paths = []
+        try:
+            documents = db.query(KnowledgeDocument)\
+                .filter(KnowledgeDocument.ai_profile_id == ai_profile_id)\
+                .limit(max(self.batch_size // 10, 1))\
+                .with_for_update()\
+                .all()
+            for document in documents:
+                released_paths.append(pdf_service.delete_document(db, document))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for released_path in released_paths:
+            if released_path:
+                pdf_service.delete_pdf(released_path)
+        return len(documents)
+
+    def _delete_profile(self, ai_profile_id: int, lease_token: str) -> bool:
+        db = SessionLocal()
+        try:
+            deleted = db.query(AIProfile)\
+                .filter(
+                    AIProfile.id == ai_profile_id,
+                    AIProfile.deleted_at.isnot(None),
+                    AIProfile.deletion_lease_owner == lease_token
+                )\
+                .delete(synchronize_session=False)
+            db.commit()
+            return deleted == 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+profile_reaper = ProfileReaper()
@@ -0,0 +1,130 @@
+from sqlalchemy.orm import Session
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from ..core.config import settings
+from ..models.ai_profile import AIProfile
+from ..models.meeting import Meeting
+from .chat_buffer import chat_write_buffer
+from .gemini_service import gemini_service
+from .meeting_service import meeting_service
+
+# Same window the routes used to fetch from chat_history on every turn
+RECENT_MESSAGES = 10
+
+class MeetingSession:
+    """In-memory state of a live meeting: profile fields, compiled prompt and recent turns"""
+
+    def __init__(self, context, recent_messages: List[dict], version: tuple, chat_version: int):
+        self.context = context
+        # (meeting status, profile updated_at) when the session was built
+        self.version = version
+        # meetings.chat_version including this worker's own saved or buffered rows
+        self.chat_version = chat_version
+        self.prompt_preamble = gemini_service.build_prompt_preamble(
+            context.coach_role,
+            context.coach_description,
+            context.domain_expertise,
+            context.pdf_excerpt
+        )
+        self.recent = deque(recent_messages, maxlen=RECENT_MESSAGES)
+        self.last_used = time.monotonic()
+
+    def history(self) -> List[dict]:
+        return list(self.recent)
+
+    def record_turn(self, user_message: str, ai_message: str):
+        self.recent.append({"message": user_message, "is_user": True})
+        self.recent.append({"message": ai_message, "is_user": False})
+
+    def note_saved(self, new_rows: int):
+        """Count rows this worker added, so only other writers' rows look like changes"""
+        self.chat_version += new_rows
+
+class MeetingSessionCache:
+    """Per-worker cache of MeetingSession keyed by meeting UUID.
+
+    Sessions are opened at meeting start (or lazily on the first turn),
+    evicted at meeting end or after MEETING_SESSION_IDLE_SECONDS, and dropped
+    when their AI profile is updated in this worker. Changes made by other
+    workers are caught by get_current, which compares the meeting status,
+    profile updated_at and meetings.chat_version with one primary-key lookup
+    per turn; no history or profile text is read unless one of them moved.
+    """
+
+    def __init__(self, idle_seconds: int):
+        self.idle_seconds = idle_seconds
+        self._sessions: Dict[str, MeetingSession] = {}
+        self._lock = threading.Lock()
+
+    def get(self, meeting_uuid: str) -> Optional[MeetingSession]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            session = self._sessions.get(meeting_uuid)
+            if session is not None:
+                session.last_used = now
+            return session
+
+    def get_current(self, db: Session, meeting_uuid: str) -> Optional[MeetingSession]:
+        """The cached session, unless another worker has changed the meeting, profile or history since"""
+        session = self.get(meeting_uuid)
+        if session is None:
+            return None
+
+        current = self._load_version(db, session.context.id)
+        if current is None:
+            self.evict(meeting_uuid)
+            return None
+        version, chat_version = current
+        # A lower stored version just means this worker's own turns are still being saved
+        if version != session.version or chat_version > session.chat_version:
+            self.evict(meeting_uuid)
+            return None
+        return session
+
+    def open(self, db: Session, context) -> MeetingSession:
+        # The only history read for the lifetime of the session
+        recent_messages = meeting_service.get_recent_messages(db, context.id, limit=RECENT_MESSAGES)
+        version, chat_version = self._load_version(db, context.id) or ((None, None), 0)
+        session = MeetingSession(context, recent_messages, version, chat_version)
+        with self._lock:
+            self._sessions[context.uuid] = session
+        return session
+
+    def get_or_open(self, db: Session, context) -> MeetingSession:
+        session = self.get(context.uuid)
+        if session is None:
+            session = self.open(db, context)
+        return session
+
+    def evict(self, meeting_uuid: str):
+        with self._lock:
+            self._sessions.pop(meeting_uuid, None)
+
+    def invalidate_profile(self, ai_profile_id: int):
+        with self._lock:
+            stale = [uuid for uuid, session in self._sessions.items()
+                     if session.context.ai_profile_id == ai_profile_id]
+            for uuid in stale:
+                del self._sessions[uuid]
+
+    def _load_version(self, db: Session, meeting_id: int) -> Optional[Tuple[tuple, int]]:
+        row = db.query(Meeting.status, AIProfile.updated_at, Meeting.chat_version)\
+            .join(AIProfile, AIProfile.id == Meeting.ai_profile_id)\
+            .filter(Meeting.id == meeting_id, AIProfile.deleted_at.is_(None))\
+            .first()
+        if row is None:
+            return None
+        pending = len(chat_write_buffer.pending_for(meeting_id)) if chat_write_buffer.enabled else 0
+        # This worker's unflushed rows will bump the version when they are flushed
+        return (row.status, row.updated_at), row.chat_version + pending
+
+    def _evict_idle(self, now: float):
+        expired = [uuid for uuid, session in self._sessions.items()
+                   if now - session.last_used > self.idle_seconds]
+        for uuid in expired:
+            del self._sessions[uuid]
+
+meeting_sessions = MeetingSessionCache(settings.MEETING_SESSION_IDLE_SECONDS)
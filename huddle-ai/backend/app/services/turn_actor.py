@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+from ..core.config import settings
+from ..core.database import SessionLocal
+from .meeting_service import meeting_service
+
+# Same window add_chat_message uses for duplicate detection
+DUPLICATE_WINDOW_SECONDS = 10
+
+class TurnResult:
+    """Reply to one turn; `persisted` resolves to the saved (user, ai) ChatHistory pair"""
+
+    def __init__(self, reply: str, persisted: asyncio.Task):
+        self.reply = reply
+        self.persisted = persisted
+
+class MeetingTurnActor:
+    """Single consumer that runs one meeting's turns strictly in order.
+
+    Each turn reads its context from the meeting session's ring buffer,
+    generates the reply off the event loop, records the turn in the ring
+    buffer and hands persistence to a background chain that keeps database
+    writes in turn order.
+    """
+
+    def __init__(self, meeting_id: int, meeting_uuid: str, registry: "TurnActorRegistry"):
+        self.meeting_id = meeting_id
+        self.meeting_uuid = meeting_uuid
+        self.closed = False
+        self._registry = registry
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._last_turn = None
+        self._last_persist: Optional[asyncio.Task] = None
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, session, user_message: str, generate: Callable[[List[dict]], str]) -> TurnResult:
+        """Queue a turn; `generate` is a blocking callable taking the history and returning the reply"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((session, user_message, generate, future))
+        return await future
+
+    async def drain(self):
+        """Wait until every turn submitted so far is answered and saved"""
+        # A marker behind the queued turns resolves once they have all been processed
+        marker = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((None, None, None, marker))
+        await marker
+        if self._last_persist is not None:
+            await asyncio.wait([self._last_persist])
+
+    async def _run(self):
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=self._registry.idle_seconds)
+            except asyncio.TimeoutError:
+                if self._queue.empty():
+                    self.closed = True
+                    self._registry.remove(self)
+                    return
+                continue
+
+            session, user_message, generate, future = item
+            if session is None:
+                future.set_result(None)
+                continue
+            try:
+                future.set_result(await self._process(session, user_message, generate))
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _process(self, session, user_message: str, generate) -> TurnResult:
+        # A double tap or re-sent upload gets the turn that is already answered
+        if self._last_turn is not None:
+            last_message, answered_at, last_result = self._last_turn
+            if last_message == user_message and time.monotonic() - answered_at < DUPLICATE_WINDOW_SECONDS:
+                print(f"Duplicate turn for meeting {self.meeting_uuid}, reusing previous reply")
+                return last_result
+
+        reply = await asyncio.to_thread(generate, session.history())
+        session.record_turn(user_message, reply)
+
+        persisted = asyncio.create_task(self._persist(self._last_persist, session, user_message, reply))
+        self._last_persist = persisted
+
+        result = TurnResult(reply, persisted)
+        self._last_turn = (user_message, time.monotonic(), result)
+        return result
+
+    async def _persist(self, previous: Optional[asyncio.Task], session, user_message: str, reply: str):
+        if previous is not None:
+            await asyncio.wait([previous])
+        return await asyncio.to_thread(self._persist_turn, session, user_message, reply)
+
+    def _persist_turn(self, session, user_message: str, reply: str):
+        db = SessionLocal()
+        try:
+            user_row, ai_row, new_rows = meeting_service.add_chat_turn(db, self.meeting_id, user_message, reply)
+            session.note_saved(new_rows)
+            return user_row, ai_row
+        finally:
+            db.close()
+
+class TurnActorRegistry:
+    """One MeetingTurnActor per meeting in this worker; idle actors shut themselves down"""
+
+    def __init__(self, idle_seconds: int):
+        self.idle_seconds = idle_seconds
+        self._actors: Dict[str, MeetingTurnActor] = {}
+
+    def for_meeting(self, context) -> MeetingTurnActor:
+        actor = self._actors.get(context.uuid)
+        if actor is None or actor.closed:
+            actor = MeetingTurnActor(context.id, context.uuid, self)
+            self._actors[context.uuid] = actor
+        return actor
+
+    async def drain(self, meeting_uuid: str):
+        """Wait until every turn already submitted for the meeting is answered and saved"""
+        actor = self._actors.get(meeting_uuid)
+        if actor is not None and not actor.closed:
+            await actor.drain()
+
+    def remove(self, actor: MeetingTurnActor):
+        if self._actors.get(actor.meeting_uuid) is actor:
+            del self._actors[actor.meeting_uuid]
+
+turn_actors = TurnActorRegistry(settings.MEETING_SESSION_IDLE_SECONDS)
@@ -0,0 +1,15 @@
+"""Bearer token verification on every authenticated request"""
+from datetime import datetime
+
+from app.core.security import create_access_token, decode_token
+from app.services.auth import Principal, principal_cache
+
+TOKEN = create_access_token({"sub": "bench@example.com", "uid": 1})
+
+def bench_decode_token(benchmark):
+    payload = benchmark(decode_token, TOKEN)
+    assert payload["uid"] == 1
+
+def bench_principal_cache_hit(benchmark):
+    principal_cache.put(TOKEN, Principal(1, "bench@example.com", "Bench", True, datetime.utcnow()))
+    assert benchmark(principal_cache.get, TOKEN).id == 1
@@ -0,0 +1,50 @@
+"""Chat history reads and the write path of a chat turn"""
+import itertools
+
+import pytest
+
+from app.services.meeting_service import meeting_service
+from conftest import SIZES
+
+@pytest.mark.parametrize("size", list(SIZES))
+def bench_get_chat_history(benchmark, seeded, db, size):
+    meeting_id = seeded[size]["chat_meeting_id"]
+
+    def run():
+        rows = meeting_service.get_chat_history(db, meeting_id)
+        # Drop the identity map so every round loads the rows again
+        db.expunge_all()
+        return rows
+
+    assert len(benchmark(run)) >= SIZES[size]
+
+@pytest.mark.parametrize("size", list(SIZES))
+def bench_get_chat_history_since_id(benchmark, seeded, db, size):
+    """Delta sync: only the last 50 messages are newer than the client's cursor"""
+    meeting_id = seeded[size]["chat_meeting_id"]
+    latest = meeting_service.get_chat_history(db, meeting_id)[-1].id
+    db.expunge_all()
+
+    def run():
+        rows = meeting_service.get_chat_history(db, meeting_id, since_id=latest - 50)
+        db.expunge_all()
+        return rows
+
+    assert len(benchmark(run)) == 50
+
+def bench_add_chat_message_duplicate(benchmark, seeded, db):
+    """A re-sent message inside the dedup window is answered from the index"""
+    meeting_id = seeded["10k"]["chat_meeting_id"]
+    first = meeting_service.add_chat_message(db, meeting_id, "Could you repeat that?", True)
+
+    result = benchmark(meeting_service.add_chat_message, db, meeting_id, "Could you repeat that?", True)
+    assert result.id == first.id
+
+def bench_add_chat_message_new(benchmark, seeded, db):
+    meeting_id = seeded["10k"]["chat_meeting_id"]
+    counter = itertools.count()
+
+    def run():
+        return meeting_service.add_chat_message(db, meeting_id, f"New message {next(counter)}", True)
+
+    assert benchmark(run).id is not None
@@ -0,0 +1,47 @@
+"""Prompt assembly and summary parsing around the LLM call"""
+from app.services.gemini_service import GeminiService
+
+# Bypass __init__ so building the service makes no network call
+service = GeminiService.__new__(GeminiService)
+
+PROFILE = {
+    "coach_role": "Leadership Coach",
+    "coach_description": "Direct but warm; asks one question at a time.",
+    "domain_expertise": "Engineering management",
+}
+PDF_CONTENT = "Situational leadership adapts the style to the readiness of the person. " * 100
+HISTORY = [
+    {"message": f"Message {i}: a sentence or two of coaching conversation.", "is_user": i % 2 == 0}
+    for i in range(10)
+]
+SUMMARY_RESPONSE = """SUMMARY:
+The user discussed delegating more of the release process to the team.
+
+KEY POINTS:
+- The release checklist lives in one person's head
+- Two engineers asked to own deployments
+
+ACTION ITEMS:
+- Write the checklist down this week
+- Pair on the next release
+"""
+
+def bench_build_prompt(benchmark):
+    prompt = benchmark(
+        service._build_prompt, "How do I delegate releases?",
+        pdf_content=PDF_CONTENT, chat_history=HISTORY, **PROFILE
+    )
+    assert "USER'S CURRENT MESSAGE" in prompt
+
+def bench_build_prompt_with_preamble(benchmark):
+    """Turns inside a live meeting reuse the session's compiled preamble"""
+    preamble = service.build_prompt_preamble(pdf_content=PDF_CONTENT, **PROFILE)
+    prompt = benchmark(
+        service._build_prompt, "How do I delegate releases?",
+        chat_history=HISTORY, prompt_preamble=preamble, **PROFILE
+    )
+    assert prompt.startswith(preamble)
+
+def bench_parse_summary_response(benchmark):
+    summary = benchmark(service._parse_summary_response, SUMMARY_RESPONSE)
+    assert summary["summary"]
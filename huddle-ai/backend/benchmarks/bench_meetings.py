@@ -0,0 +1,16 @@
+"""Meeting list query behind GET /meetings/"""
+import pytest
+
+from app.services.meeting_service import meeting_service
+from conftest import SIZES
+
+@pytest.mark.parametrize("size", list(SIZES))
+def bench_get_user_meetings(benchmark, seeded, db, size):
+    user_id = seeded[size]["user_id"]
+
+    def run():
+        meetings = meeting_service.get_user_meetings(db, user_id)
+        db.expunge_all()
+        return meetings
+
+    assert len(benchmark(run)) == SIZES[size]
@@ -0,0 +1,112 @@
+"""Serialization micro-benchmark for the list endpoints.
+
+Compares FastAPI's default path (validate each ORM row with from_attributes,
+jsonable_encoder, stdlib json) with ListSerializer (model_construct plus a
+prebuilt TypeAdapter). Collected by the pytest-benchmark suite, or run
+standalone from the backend directory for a side-by-side table:
+
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_serialization
+"""
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.core.serialization import ListSerializer
+from app.models.chat import ChatHistory, compute_content_hash
+from app.models.meeting import Meeting as MeetingModel, MeetingStatus
+from app.schemas.chat import ChatMessage
+from app.schemas.meeting import Meeting
+
+REPEATS = 5
+
+def make_meetings(count: int) -> List[MeetingModel]:
+    now = datetime.utcnow()
+    return [
+        MeetingModel(
+            id=i,
+            uuid=f"00000000-0000-0000-0000-{i:012d}",
+            title=f"Weekly coaching session {i}",
+            created_by=1,
+            ai_profile_id=i % 7 + 1,
+            status=MeetingStatus.completed,
+            scheduled_at=now - timedelta(days=i),
+            started_at=now - timedelta(days=i),
+            ended_at=now - timedelta(days=i) + timedelta(minutes=30),
+            transcript="User: hello\nAI: hi there\n" * 20,
+            summary="Discussed goals and blockers for the quarter.",
+            key_points="- goals\n- blockers",
+            action_items="- follow up",
+            created_at=now - timedelta(days=i)
+        )
+        for i in range(1, count + 1)
+    ]
+
+def make_chat_rows(count: int) -> List[ChatHistory]:
+    now = datetime.utcnow()
+    rows = []
+    for i in range(1, count + 1):
+        message = f"Message number {i} with a sentence or two of coaching conversation."
+        rows.append(ChatHistory(
+            id=i,
+            meeting_id=1,
+            message=message,
+            content_hash=compute_content_hash(message),
+            is_user=i % 2 == 1,
+            created_at=now + timedelta(seconds=i)
+        ))
+    return rows
+
+def default_path(schema) -> Callable[[list], bytes]:
+    """What FastAPI does for response_model=List[schema] with a JSONResponse"""
+    def serialize(rows):
+        validated = [schema.model_validate(row) for row in rows]
+        content = jsonable_encoder(validated)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return serialize
+
+def fast_path(schema) -> Callable[[list], bytes]:
+    return ListSerializer(schema).to_json
+
+def best_of(fn: Callable[[list], bytes], rows: list) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+CASES = {
+    "meetings-1k": (Meeting, make_meetings, 1000),
+    "chat-10k": (ChatMessage, make_chat_rows, 10000),
+}
+
+@pytest.mark.parametrize("case", list(CASES))
+def bench_default_serialization(benchmark, case):
+    schema, make_rows, count = CASES[case]
+    benchmark(default_path(schema), make_rows(count))
+
+@pytest.mark.parametrize("case", list(CASES))
+def bench_list_serializer(benchmark, case):
+    schema, make_rows, count = CASES[case]
+    benchmark(fast_path(schema), make_rows(count))
+
+def main():
+    print(f"{'case':<16}{'default (ms)':>14}{'fast (ms)':>12}{'speedup':>10}")
+    for name, (schema, make_rows, count) in CASES.items():
+        rows = make_rows(count)
+        before = best_of(default_path(schema), rows)
+        after = best_of(fast_path(schema), rows)
+        print(f"{name:<16}{before * 1000:>14.2f}{after * 1000:>12.2f}{before / after:>9.1f}x")
+
+        # Both paths must produce the same document
+        if json.loads(default_path(schema)(rows)) != json.loads(fast_path(schema)(rows)):
+            print(f"  output mismatch for {name}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare two pytest-benchmark JSON reports and fail on regressions.
+
+    python benchmarks/compare.py baseline.json current.json --threshold 10
+
+Exits 1 if any benchmark present in both reports got slower than the
+threshold (percent, on the chosen statistic). Benchmarks missing from
+either side are listed but never fail the run.
+"""
+import argparse
+import json
+import sys
+from typing import Dict
+
+def load_stats(path: str, stat: str) -> Dict[str, float]:
+    with open(path) as f:
+        report = json.load(f)
+    return {bench["fullname"]: bench["stats"][stat] for bench in report["benchmarks"]}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="allowed slowdown in percent (default 10)")
+    parser.add_argument("--stat", choices=["min", "median", "mean"], default="median")
+    args = parser.parse_args()
+
+    baseline = load_stats(args.baseline, args.stat)
+    current = load_stats(args.current, args.stat)
+
+    regressions = 0
+    width = max((len(name) for name in baseline.keys() | current.keys()), default=10)
+    print(f"{'benchmark':<{width}}{'baseline (ms)':>16}{'current (ms)':>16}{'change':>10}")
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in baseline or name not in current:
+            side = "baseline" if name not in baseline else "current"
+            print(f"{name:<{width}}{'':>32}  missing from {side}")
+            continue
+
+        before, after = baseline[name], current[name]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<{width}}{before * 1000:>16.3f}{after * 1000:>16.3f}{change:>+9.1f}%{flag}")
+
+    if regressions:
+        print(f"\n{regressions} benchmark(s) regressed by more than {args.threshold:g}% ({args.stat})")
+        return 1
+    print(f"\nNo regressions above {args.threshold:g}% ({args.stat})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
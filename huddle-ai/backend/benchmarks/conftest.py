@@ -0,0 +1,114 @@
+"""Shared setup for the backend benchmark suite.
+
+Runs against a throwaway SQLite file by default, or against the database in
+BENCH_DATABASE_URL (e.g. a local MySQL); seeded rows are reused when present.
+
+    pip install -r benchmarks/requirements.txt
+    pytest -c benchmarks/pytest.ini benchmarks --benchmark-json=benchmarks/results/current.json
+    python benchmarks/compare.py benchmarks/results/baseline.json benchmarks/results/current.json
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the backend directory to the path, as the migration scripts do
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_workdir = tempfile.mkdtemp(prefix="huddle-bench-")
+os.environ["DATABASE_URL"] = os.environ.get(
+    "BENCH_DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.sqlite3')}"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DEEPGRAM_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ["UPLOAD_DIR"] = os.path.join(_workdir, "uploads")
+os.environ["CHAT_JOURNAL_DIR"] = os.path.join(_workdir, "journal")
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.models.ai_profile import AIProfile
+from app.models.meeting import Meeting, MeetingStatus
+from app.models.chat import ChatHistory, compute_content_hash
+from app.models import pdf_blob, knowledge  # noqa: F401  (registers the remaining tables)
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+INSERT_BATCH = 10_000
+
+def _insert_batched(db, model, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        db.execute(insert(model), rows[start:start + INSERT_BATCH])
+
+def _seed_size(db, label: str, count: int) -> dict:
+    """One user owning `count` meetings, one of which holds `count` chat messages"""
+    email = f"bench-{label}@example.com"
+    user = db.query(User).filter(User.email == email).first()
+    if user is not None:
+        chat_meeting = db.query(Meeting).filter(Meeting.uuid == f"bench-{label}-chat").first()
+        return {"user_id": user.id, "chat_meeting_id": chat_meeting.id}
+
+    user = User(email=email, name=f"Bench {label}", hashed_password="x")
+    db.add(user)
+    db.flush()
+
+    profile = AIProfile(
+        created_by=user.id,
+        coach_name=f"Coach {label}",
+        coach_role="Leadership Coach",
+        coach_description="Helps managers grow their teams.",
+        domain_expertise="Leadership",
+        gender="FEMALE"
+    )
+    db.add(profile)
+    db.flush()
+
+    now = datetime.utcnow()
+    _insert_batched(db, Meeting, [
+        {
+            "uuid": f"bench-{label}-chat" if i == 0 else f"bench-{label}-{i}",
+            "title": f"Coaching session {i}",
+            "created_by": user.id,
+            "ai_profile_id": profile.id,
+            "status": MeetingStatus.completed,
+            "summary": "Discussed goals and blockers for the quarter.",
+            "created_at": now - timedelta(minutes=i)
+        }
+        for i in range(count)
+    ])
+    chat_meeting = db.query(Meeting).filter(Meeting.uuid == f"bench-{label}-chat").first()
+
+    messages = [f"Message {i}: a sentence or two of coaching conversation." for i in range(count)]
+    _insert_batched(db, ChatHistory, [
+        {
+            "meeting_id": chat_meeting.id,
+            "message": message,
+            "content_hash": compute_content_hash(message),
+            "is_user": i % 2 == 0,
+            "created_at": now - timedelta(days=1) + timedelta(seconds=i)
+        }
+        for i, message in enumerate(messages)
+    ])
+    db.commit()
+    return {"user_id": user.id, "chat_meeting_id": chat_meeting.id}
+
+@pytest.fixture(scope="session")
+def seeded():
+    Base.metadata.create_all(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        return {label: _seed_size(db, label, count) for label, count in SIZES.items()}
+    finally:
+        db.close()
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
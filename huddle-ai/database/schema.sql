@@ -12,6 +12,28 @@ CREATE TABLE users (
     INDEX idx_email (email)
 );
 
+CREATE TABLE pdf_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size BIGINT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    page_count INT,
+    extracted_text LONGTEXT,
+    chunk_count INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE knowledge_chunks (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    blob_sha256 CHAR(64) NOT NULL,
+    chunk_index INT NOT NULL,
+    page_number INT NOT NULL,
+    start_offset INT NOT NULL,
+    end_offset INT NOT NULL,
+    content TEXT NOT NULL,
+    FOREIGN KEY (blob_sha256) REFERENCES pdf_blobs(sha256),
+    INDEX idx_knowledge_blob_chunk (blob_sha256, chunk_index)
+);
+
 CREATE TABLE ai_profiles (
     id INT AUTO_INCREMENT PRIMARY KEY,
     created_by INT NOT NULL,
@@ -23,10 +45,38 @@ CREATE TABLE ai_profiles (
     user_notes TEXT,
     pdf_content TEXT,
     pdf_filename VARCHAR(255),
+    pdf_summary TEXT,
+    pdf_page_count INT,
+    pdf_char_count INT,
+    pdf_chunk_count INT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    deleted_at TIMESTAMP NULL,
+    deletion_lease_until TIMESTAMP NULL,
+    deletion_lease_owner VARCHAR(32) NULL,
     FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_created_by (created_by)
+    INDEX idx_created_by (created_by),
+    INDEX idx_deleted_at (deleted_at),
+    INDEX idx_ai_profiles_owner_updated (created_by, deleted_at, updated_at)
+);
+
+CREATE TABLE knowledge_documents (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    ai_profile_id INT NOT NULL,
+    blob_sha256 CHAR(64),
+    filename VARCHAR(255) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    error TEXT,
+    summary TEXT,
+    page_count INT,
+    char_count INT,
+    chunk_count INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (ai_profile_id) REFERENCES ai_profiles(id) ON DELETE CASCADE,
+    FOREIGN KEY (blob_sha256) REFERENCES pdf_blobs(sha256),
+    INDEX idx_ai_profile_id (ai_profile_id),
+    INDEX idx_blob_sha256 (blob_sha256)
 );
 
 CREATE TABLE meetings (
@@ -45,20 +95,24 @@ CREATE TABLE meetings (
     action_items TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    chat_version INT NOT NULL DEFAULT 0,
     FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (ai_profile_id) REFERENCES ai_profiles(id) ON DELETE CASCADE,
     INDEX idx_uuid (uuid),
     INDEX idx_created_by (created_by),
-    INDEX idx_status (status)
+    INDEX idx_status (status),
+    INDEX idx_meetings_owner_updated (created_by, updated_at)
 );
 
 CREATE TABLE chat_history (
     id INT AUTO_INCREMENT PRIMARY KEY,
     meeting_id INT NOT NULL,
     message TEXT NOT NULL,
+    content_hash CHAR(64) NOT NULL,
     is_user BOOLEAN NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE,
     INDEX idx_meeting_id (meeting_id),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    INDEX idx_chat_dedup (meeting_id, is_user, content_hash, created_at)
 );
\ No newline at end of file
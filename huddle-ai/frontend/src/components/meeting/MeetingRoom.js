@@ -19,7 +19,6 @@ const MeetingRoom = ({ meeting, aiProfile }) => {
   const [showChat, setShowChat] = useState(false);
   const [chatMessages, setChatMessages] = useState([]);
   const [chatInput, setChatInput] = useState('');
-  const [transcript, setTranscript] = useState('');
   const [processing, setProcessing] = useState(false);
   const [mediaError, setMediaError] = useState('');
   const [connectionStatus, setConnectionStatus] = useState('connecting');
@@ -194,17 +193,15 @@ const MeetingRoom = ({ meeting, aiProfile }) => {
         
         if (userTranscript) {
           setLastUserMessage(userTranscript);
-          setTranscript(prev => prev + '\nUser: ' + userTranscript);
         }
         
         if (aiResponse) {
-          setTranscript(prev => prev + '\nAI: ' + aiResponse);
-          
           if (ttsEnabled && response.data && response.data.size > 0) {
             try {
               setAudioDebugInfo(prev => prev + 'Playing AI audio response...\n');
               // Play the audio response
-              const audioBlob = new Blob([response.data], { type: 'audio/wav' });
+              const audioType = response.headers['content-type'] || 'audio/wav';
+              const audioBlob = new Blob([response.data], { type: audioType });
               await webrtcRef.current.playAudioResponse(audioBlob);
               setAudioDebugInfo(prev => prev + 'Audio playback completed\n');
               console.log('Audio response played successfully');
@@ -261,7 +258,7 @@ const MeetingRoom = ({ meeting, aiProfile }) => {
   const handleEndMeeting = async () => {
     if (window.confirm('Are you sure you want to end this meeting?')) {
       try {
-        await meetingsAPI.end(meeting.uuid, transcript);
+        await meetingsAPI.end(meeting.uuid);
         navigate('/dashboard');
       } catch (error) {
         console.error('Failed to end meeting:', error);
@@ -40,9 +40,7 @@ export const meetingsAPI = {
   getAll: () => api.get('/meetings'),
   getByUuid: (uuid) => api.get(`/meetings/${uuid}`),
   start: (uuid) => api.put(`/meetings/${uuid}/start`),
-  end: (uuid, transcript = '') => api.put(`/meetings/${uuid}/end`, null, {
-    params: { transcript }
-  }),
+  end: (uuid) => api.put(`/meetings/${uuid}/end`),
   update: (uuid, data) => api.put(`/meetings/${uuid}`, data),
 };
 
@@ -67,12 +65,21 @@ export const chatAPI = {
   generateResponse: (meetingUuid, message) => api.post(`/chat/${meetingUuid}/generate-response`, { message }),
 };
 
+// Ask for Opus where the browser can play it, otherwise MP3; WAV is the last resort
+const replyAudioAccept = () => {
+  const canPlayOpus = typeof Audio !== 'undefined'
+    && new Audio().canPlayType('audio/ogg; codecs="opus"') !== '';
+  return canPlayOpus
+    ? 'audio/ogg, audio/mpeg;q=0.9, audio/wav;q=0.5'
+    : 'audio/mpeg, audio/wav;q=0.5';
+};
+
 export const audioAPI = {
   processAudio: (meetingUuid, audioBlob) => {
     const formData = new FormData();
     formData.append('audio_file', audioBlob, 'audio.wav');
     return api.post(`/audio/${meetingUuid}/process`, formData, {
-      headers: { 'Content-Type': 'multipart/form-data' },
+      headers: { 'Content-Type': 'multipart/form-data', Accept: replyAudioAccept() },
       responseType: 'blob',
     });
   },
@@ -86,6 +93,7 @@ export const audioAPI = {
   synthesize: (meetingUuid, text) => {
     return api.post(`/audio/${meetingUuid}/synthesize`, null, {
       params: { text },
+      headers: { Accept: replyAudioAccept() },
       responseType: 'blob',
     });
   },